@@ -0,0 +1,57 @@
+"""Bridge to the external Socket.IO notification server.
+
+The socket server runs as a separate Railway service. Broadcasts are
+queued onto a Redis list that the socket server drains, so request
+handlers never wait on the fan-out; the direct POST remains as the
+fallback when Redis is unconfigured.
+"""
+
+import os
+
+import requests
+
+from api.updates import get_redis, json_dumps
+
+SOCKET_SERVER_URL = os.getenv("SOCKET_SERVER_URL", "http://localhost:4000")
+BROADCAST_QUEUE_KEY = "broadcast_q"
+
+
+def _enqueue(message):
+    client = get_redis()
+    if client is None:
+        return False
+    try:
+        client.rpush(BROADCAST_QUEUE_KEY, json_dumps(message))
+        return True
+    except Exception:
+        return False
+
+
+def queue_update(update_data, channel):
+    """Queue an update broadcast; falls back to a synchronous POST."""
+    if not _enqueue({"type": "update", "update": update_data, "channel": channel}):
+        broadcast_update(update_data, channel)
+
+
+def queue_notification(kind, data):
+    """Queue a SOP/lesson notification; falls back to a synchronous POST."""
+    if not _enqueue({"type": "notification", "kind": kind, "data": data}):
+        broadcast_notification(kind, data)
+
+
+def broadcast_update(update_data, channel):
+    """Notify the socket server that a new update was posted."""
+    requests.post(
+        f"{SOCKET_SERVER_URL}/broadcast/update",
+        json={"update": update_data, "channel": channel},
+        timeout=5,
+    )
+
+
+def broadcast_notification(kind, data):
+    """Notify the socket server about a new SOP summary / lesson learned."""
+    requests.post(
+        f"{SOCKET_SERVER_URL}/broadcast/notification",
+        json={"kind": kind, "data": data},
+        timeout=5,
+    )
@@ -0,0 +1,61 @@
+"""Small helpers shared by the API-ish endpoints in app.py."""
+
+import os
+
+import redis
+
+# One encode/decode pair for everything that serializes JSON off the
+# Flask response path (Redis cache values, the broadcast queue): orjson
+# when installed, stdlib otherwise. Both sides deal in bytes.
+try:
+    import orjson
+
+    def json_dumps(obj):
+        return orjson.dumps(obj)
+
+    json_loads = orjson.loads
+    ORJSON_AVAILABLE = True
+except ImportError:
+    import json as _stdlib_json
+
+    def json_dumps(obj):
+        return _stdlib_json.dumps(obj).encode("utf-8")
+
+    json_loads = _stdlib_json.loads
+    ORJSON_AVAILABLE = False
+
+_redis_client = None
+
+
+def get_redis():
+    """Shared Redis client, created lazily from REDIS_URL.
+
+    Returns None when no REDIS_URL is configured so callers can fall
+    back to hitting the database directly.
+    """
+    global _redis_client
+    if _redis_client is None:
+        redis_url = os.getenv("REDIS_URL")
+        if not redis_url:
+            return None
+        _redis_client = redis.Redis.from_url(redis_url, socket_timeout=2)
+    return _redis_client
+
+
+def is_redis_healthy():
+    """Ping Redis over the shared client and report reachability.
+
+    Reuses the lazy module client so each probe is a PING on an
+    established connection, not a fresh TCP connect + auth. On failure
+    the client is dropped so the next call reconnects cleanly.
+    """
+    global _redis_client
+    client = get_redis()
+    if client is None:
+        return False
+    try:
+        client.ping()
+        return True
+    except Exception:
+        _redis_client = None
+        return False
@@ -0,0 +1,2559 @@
+"""LoopIn — a small team updates board.
+
+Single-module Flask app: auth, updates feed, SOP summaries, lessons
+learned, read tracking, activity logs, archives, Excel export, backups
+and health/metrics endpoints. Deployed on Railway behind gunicorn.
+"""
+
+import importlib.util
+import os
+import queue
+import string
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache, wraps
+from tempfile import SpooledTemporaryFile
+from zoneinfo import ZoneInfo
+
+from dotenv import load_dotenv
+from flask import (
+    Flask,
+    flash,
+    g,
+    jsonify,
+    make_response,
+    redirect,
+    render_template,
+    request,
+    send_file,
+    session,
+    url_for,
+)
+from flask_caching import Cache
+from flask_migrate import Migrate
+from jinja2 import FileSystemBytecodeCache
+from sqlalchemy import Integer, bindparam, event, func, inspect, literal, select, text
+from sqlalchemy import delete as sa_delete
+from sqlalchemy import update as sa_update
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import load_only, selectinload
+
+# pandas/openpyxl/prometheus_client are only needed by the Excel export
+# and /metrics; probing for them is enough at import time, the real
+# imports happen inside those routes. Keeps cold start fast and worker
+# RSS low on requests that never touch them.
+EXCEL_EXPORT_AVAILABLE = (
+    importlib.util.find_spec("pandas") is not None
+    and importlib.util.find_spec("openpyxl") is not None
+)
+PROMETHEUS_AVAILABLE = importlib.util.find_spec("prometheus_client") is not None
+
+# The encode/decode pair lives in api.updates so the socket bridge can
+# share it without importing this module.
+from api.updates import ORJSON_AVAILABLE, get_redis, is_redis_healthy
+from api.updates import json_dumps as _json_dumps
+from api.updates import json_loads as _json_loads
+
+if ORJSON_AVAILABLE:
+    import orjson
+
+    from flask.json.provider import JSONProvider
+
+    class ORJSONProvider(JSONProvider):
+        """orjson-backed provider — 2-3x faster than stdlib json for the
+        dict payloads jsonify builds on the health/API endpoints."""
+
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj).decode("utf-8")
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+from models import (
+    ActivityLog,
+    ArchivedLessonLearned,
+    ArchivedSOPSummary,
+    ArchivedUpdate,
+    LessonLearned,
+    ReadLog,
+    SOPSummary,
+    Update,
+    User,
+    db,
+    now_utc,
+)
+from read_logs import read_logs_bp
+
+APP_NAME = "LoopIn"
+_START_TIME = time.time()
+
+authorized_users = ["Kamran Arbaz", "Drishya CM", "Abigail Das"]
+# O(1) membership for the per-POST authorization check; the list above
+# stays for anything that needs a stable display order.
+AUTHORIZED_USERS = frozenset(authorized_users)
+
+# Hoisted so every request shares one interned tuple instead of
+# rebuilding the list per call.
+AVAILABLE_PROCESSES = ("ABC", "XYZ", "AB")
+
+
+# ---------------------------------------------------------------------------
+# time helpers
+# ---------------------------------------------------------------------------
+
+def ensure_timezone(ts):
+    """Attach UTC to naive datetimes coming back from the DB."""
+    if ts is None:
+        return None
+    if ts.tzinfo is None:
+        return ts.replace(tzinfo=timezone.utc)
+    return ts
+
+
+def is_within_hours(ts, hours, current_time):
+    """True if ts is within the last `hours` hours of current_time."""
+    ts = ensure_timezone(ts)
+    if ts is None:
+        return False
+    return (current_time - ts) <= timedelta(hours=hours)
+
+
+# Short-TTL response cache for the polled JSON APIs — Redis-backed in
+# production, in-process SimpleCache when REDIS_URL is unset (dev).
+cache = Cache()
+
+
+# ---------------------------------------------------------------------------
+# app factory
+# ---------------------------------------------------------------------------
+
+def create_app():
+    load_dotenv()
+
+    app = Flask(__name__)
+    app.secret_key = os.getenv("SECRET_KEY", "dev-secret-change-me")
+
+    database_url = os.getenv("DATABASE_URL", "sqlite:///loopin.db")
+    if database_url.startswith("postgres://"):
+        database_url = database_url.replace("postgres://", "postgresql://", 1)
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_url
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    # The app issues a small set of query shapes over and over; a larger
+    # compiled-query cache keeps them all hot instead of recompiling the
+    # Core expression per call (the 1.4+ "lambda cache" default is 500).
+    engine_options = {"query_cache_size": 1200}
+    if database_url.startswith("postgresql"):
+        # Each handler runs several short queries; a bigger pool with
+        # LIFO checkout keeps connections warm under concurrency instead
+        # of stalling on the 5+10 default. pre_ping/recycle guard against
+        # the stale connections managed Postgres drops after idling, and
+        # the statement timeout stops any one query from wedging a worker.
+        # Sizes are env-tunable so deployments can match their Postgres
+        # max_connections budget without a code change.
+        engine_options.update(
+            pool_size=int(os.getenv("PG_POOL_SIZE", "25")),
+            max_overflow=int(os.getenv("PG_MAX_OVERFLOW", "25")),
+            pool_pre_ping=True,
+            pool_recycle=int(os.getenv("PG_POOL_RECYCLE", "1800")),
+            pool_use_lifo=True,
+            # Multi-row writes (the activity-log batch flusher, bulk
+            # restores) go out as a single rewritten VALUES statement
+            # instead of one protocol round trip per row.
+            executemany_mode="values_plus_batch",
+            executemany_values_page_size=100,
+        )
+        # TCP keepalives surface dead peers (NAT timeouts, failovers)
+        # in seconds instead of hanging a checkout until kernel defaults
+        # kick in.
+        engine_options["connect_args"] = {
+            "sslmode": os.getenv("PGSSLMODE", "prefer"),
+            "options": "-c statement_timeout=5000",
+            "keepalives": 1,
+            "keepalives_idle": 30,
+            "keepalives_interval": 10,
+            "keepalives_count": 5,
+        }
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options
+
+    if ORJSON_AVAILABLE:
+        app.json = ORJSONProvider(app)
+
+    # Persist compiled Jinja bytecode across worker restarts so each
+    # template is parsed+compiled once per deploy, not once per process.
+    cache_dir = os.path.join(app.root_path, ".jinja_cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+    if os.getenv("RAILWAY_ENVIRONMENT") or os.getenv("FLASK_ENV") == "production":
+        # No template edits in prod; skip the per-render mtime stat.
+        app.config["TEMPLATES_AUTO_RELOAD"] = False
+        app.jinja_env.auto_reload = False
+
+    redis_url = os.getenv("REDIS_URL")
+    if redis_url:
+        cache.init_app(
+            app, config={"CACHE_TYPE": "RedisCache", "CACHE_REDIS_URL": redis_url}
+        )
+    else:
+        cache.init_app(app, config={"CACHE_TYPE": "SimpleCache"})
+
+    # Render-path invariants: templates read app_name from a Jinja
+    # global instead of a kwarg threaded through every render_template
+    # call, and the process list is reachable via config for anything
+    # outside route code.
+    app.jinja_env.globals["app_name"] = APP_NAME
+    app.config["PROCESSES"] = AVAILABLE_PROCESSES
+
+    db.init_app(app)
+    Migrate(app, db)
+    app.register_blueprint(read_logs_bp)
+
+    # One backup system for the process: the constructor ensures the
+    # backup directory exists, which doesn't belong on request paths.
+    from backup_system import DatabaseBackupSystem
+
+    app.backup_system = DatabaseBackupSystem()
+
+    # Bootstrap runs by default everywhere: no migrations ship with the
+    # repo, and runtime code depends on what the _ensure_* helpers
+    # install (post_update's RETURNING insert needs the server-side id
+    # and timestamp defaults; mark_read trusts the read_count trigger on
+    # Postgres). AUTO_CREATE_SCHEMA=0 is an explicit opt-out for deploys
+    # that manage the full schema — defaults and trigger included —
+    # through their own migrations.
+    if os.getenv("AUTO_CREATE_SCHEMA", "1") == "1":
+        with app.app_context():
+            db.create_all()
+            _ensure_search_indexes()
+            _ensure_read_count_trigger()
+            _ensure_insert_defaults()
+
+    return app
+
+
+def _ensure_search_indexes():
+    """Create the full-text GIN indexes backing /search (Postgres only).
+
+    The schema is create_all-managed, so index DDL lives here rather than
+    in a migration. Expressions must stay in sync with _SEARCH_SQL.
+    """
+    if db.engine.dialect.name != "postgresql":
+        return
+    ddl = [
+        """CREATE INDEX IF NOT EXISTS ix_updates_fts ON updates USING gin
+           (to_tsvector('english',
+               coalesce(message,'') || ' ' || name || ' ' || process))""",
+        """CREATE INDEX IF NOT EXISTS ix_sop_summaries_fts ON sop_summaries
+           USING gin (to_tsvector('english',
+               coalesce(title,'') || ' ' || coalesce(summary_text,'')
+               || ' ' || coalesce(tags,'')))""",
+        """CREATE INDEX IF NOT EXISTS ix_lessons_learned_fts ON lessons_learned
+           USING gin (to_tsvector('english',
+               coalesce(title,'') || ' ' || coalesce(content,'')))""",
+        # Trigram indexes back the ILIKE arm of _SEARCH_SQL: stemmed FTS
+        # can't match partial tokens ("loop" in "LoopIn"), so each branch
+        # also ILIKEs its main text columns and the planner BitmapOrs
+        # these with the tsvector index.
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        """CREATE INDEX IF NOT EXISTS ix_updates_message_trgm
+           ON updates USING gin (message gin_trgm_ops)""",
+        """CREATE INDEX IF NOT EXISTS ix_sop_summaries_title_trgm
+           ON sop_summaries USING gin (title gin_trgm_ops)""",
+        """CREATE INDEX IF NOT EXISTS ix_sop_summaries_text_trgm
+           ON sop_summaries USING gin (summary_text gin_trgm_ops)""",
+        """CREATE INDEX IF NOT EXISTS ix_lessons_learned_title_trgm
+           ON lessons_learned USING gin (title gin_trgm_ops)""",
+        """CREATE INDEX IF NOT EXISTS ix_lessons_learned_content_trgm
+           ON lessons_learned USING gin (content gin_trgm_ops)""",
+    ]
+    with db.engine.begin() as conn:
+        for stmt in ddl:
+            conn.execute(text(stmt))
+
+
+def _ensure_read_count_trigger():
+    """Keep updates.read_count in sync from a Postgres trigger.
+
+    show_updates used to LEFT JOIN read_logs and GROUP BY per render;
+    the denormalized counter turns that into a plain column read. On
+    SQLite the blueprint increments the column in the application
+    instead (see read_logs.mark_read).
+    """
+    if db.engine.dialect.name != "postgresql":
+        return
+    with db.engine.begin() as conn:
+        # One-time for databases that predate the column: create_all
+        # only adds missing tables, so add read_count here and seed it
+        # from the existing read_logs rows before the trigger takes
+        # over maintenance.
+        has_column = conn.execute(
+            text(
+                "SELECT 1 FROM information_schema.columns"
+                " WHERE table_name = 'updates' AND column_name = 'read_count'"
+            )
+        ).scalar()
+        if not has_column:
+            conn.execute(
+                text(
+                    "ALTER TABLE updates ADD COLUMN read_count"
+                    " integer NOT NULL DEFAULT 0"
+                )
+            )
+            conn.execute(
+                text(
+                    """UPDATE updates SET read_count = counts.n
+                       FROM (SELECT update_id, count(*) AS n
+                             FROM read_logs GROUP BY update_id) counts
+                       WHERE updates.id = counts.update_id"""
+                )
+            )
+    ddl = [
+        """CREATE OR REPLACE FUNCTION loopin_bump_read_count() RETURNS trigger AS $$
+           BEGIN
+               IF TG_OP = 'INSERT' THEN
+                   UPDATE updates SET read_count = read_count + 1
+                   WHERE id = NEW.update_id;
+               ELSIF TG_OP = 'DELETE' THEN
+                   UPDATE updates SET read_count = read_count - 1
+                   WHERE id = OLD.update_id;
+               END IF;
+               RETURN NULL;
+           END;
+           $$ LANGUAGE plpgsql""",
+        """CREATE OR REPLACE TRIGGER trg_read_logs_count
+           AFTER INSERT OR DELETE ON read_logs
+           FOR EACH ROW EXECUTE FUNCTION loopin_bump_read_count()""",
+    ]
+    with db.engine.begin() as conn:
+        for stmt in ddl:
+            conn.execute(text(stmt))
+
+
+def _ensure_insert_defaults():
+    """Let Postgres mint update ids and timestamps at INSERT time.
+
+    With server-side defaults post_update can ship only the user data
+    and read id/timestamp back via RETURNING instead of generating
+    them in Python. SQLite keeps the column-level Python defaults.
+    """
+    if db.engine.dialect.name != "postgresql":
+        return
+    with db.engine.begin() as conn:
+        # Pre-existing databases created the column as naive timestamp;
+        # convert once (the type check keeps the table rewrite from
+        # re-running on every boot).
+        col_type = conn.execute(
+            text(
+                "SELECT data_type FROM information_schema.columns"
+                " WHERE table_name = 'updates' AND column_name = 'timestamp'"
+            )
+        ).scalar()
+        if col_type == "timestamp without time zone":
+            conn.execute(
+                text(
+                    "ALTER TABLE updates ALTER COLUMN timestamp"
+                    " TYPE timestamptz USING timestamp AT TIME ZONE 'utc'"
+                )
+            )
+        # Likewise one-time: the id columns started life as varchar(32)
+        # hex strings. Native uuid halves the PK B-tree and the ReadLog
+        # join key; the FK has to come off while both sides change type.
+        id_type = conn.execute(
+            text(
+                "SELECT data_type FROM information_schema.columns"
+                " WHERE table_name = 'updates' AND column_name = 'id'"
+            )
+        ).scalar()
+        if id_type == "character varying":
+            conn.execute(
+                text(
+                    """DO $$
+                       DECLARE fk text;
+                       BEGIN
+                         SELECT conname INTO fk FROM pg_constraint
+                          WHERE conrelid = 'read_logs'::regclass
+                            AND confrelid = 'updates'::regclass;
+                         IF fk IS NOT NULL THEN
+                           EXECUTE format(
+                             'ALTER TABLE read_logs DROP CONSTRAINT %I', fk);
+                         END IF;
+                         ALTER TABLE read_logs ALTER COLUMN update_id
+                           TYPE uuid USING update_id::uuid;
+                         ALTER TABLE updates ALTER COLUMN id
+                           TYPE uuid USING id::uuid;
+                         ALTER TABLE archived_updates ALTER COLUMN id
+                           TYPE uuid USING id::uuid;
+                         ALTER TABLE read_logs
+                           ADD CONSTRAINT read_logs_update_id_fkey
+                           FOREIGN KEY (update_id) REFERENCES updates (id);
+                       END $$"""
+                )
+            )
+        ddl = [
+            "CREATE EXTENSION IF NOT EXISTS pgcrypto",
+            "ALTER TABLE updates ALTER COLUMN id SET DEFAULT gen_random_uuid()",
+            "ALTER TABLE updates ALTER COLUMN timestamp SET DEFAULT now()",
+        ]
+        for stmt in ddl:
+            conn.execute(text(stmt))
+
+
+app = create_app()
+
+
+# ---------------------------------------------------------------------------
+# N+1 guard: per-request SQL query counter
+# ---------------------------------------------------------------------------
+
+# Any handler that legitimately needs more than this is doing per-row
+# queries somewhere; the warning names the path so the regression is
+# visible in logs before it becomes a latency complaint.
+QUERY_COUNT_WARN_THRESHOLD = 10
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    try:
+        g._query_count = getattr(g, "_query_count", 0) + 1
+    except RuntimeError:
+        # Outside a request context (startup DDL, background writers).
+        pass
+
+
+@app.after_request
+def _warn_chatty_request(response):
+    count = g.get("_query_count", 0)
+    if count > QUERY_COUNT_WARN_THRESHOLD:
+        app.logger.warning("%s issued %d SQL queries", request.path, count)
+    return response
+
+
+# ---------------------------------------------------------------------------
+# auth helpers / context processors
+# ---------------------------------------------------------------------------
+
+SESSION_CACHE_TTL = 3600
+
+
+class _CachedUser:
+    """User attributes rebuilt from the Redis session cache.
+
+    Quacks like a User for the attributes views and templates read
+    (id, username, display_name, role) without an ORM round-trip.
+    """
+
+    __slots__ = ("id", "username", "display_name", "role")
+
+    def __init__(self, id, username, display_name, role):
+        self.id = id
+        self.username = username
+        self.display_name = display_name
+        self.role = role
+
+
+def _session_cache_key(token):
+    return f"sess:{token}"
+
+
+def _cache_session_user(user):
+    """Stash the verified user in Redis and hand back the session token."""
+    client = get_redis()
+    if client is None:
+        return None
+    token = uuid.uuid4().hex
+    payload = {
+        "id": user.id,
+        "username": user.username,
+        "display_name": user.display_name,
+        "role": user.role,
+    }
+    try:
+        client.setex(_session_cache_key(token), SESSION_CACHE_TTL, _json_dumps(payload))
+    except Exception:
+        return None
+    return token
+
+
+def _load_session_user():
+    """Rebuild the current user from the Redis session cache, if present."""
+    token = session.get("auth_token")
+    if not token:
+        return None
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        cached = client.get(_session_cache_key(token))
+    except Exception:
+        return None
+    if cached is None:
+        return None
+    return _CachedUser(**_json_loads(cached))
+
+
+def get_current_user():
+    """Load the logged-in user once per request, cached on flask.g.
+
+    Both context processors, login_required and several views need the
+    same row; without the cache each of them issued an identical SELECT.
+    The Redis session cache (populated at login) answers first so most
+    requests skip the database entirely; db.session.get is the fallback
+    and also hits the SQLAlchemy identity map directly instead of
+    building a Query per call.
+    """
+    user = g.get("_current_user")
+    if user is None and "user_id" in session:
+        user = _load_session_user()
+        if user is None:
+            user = db.session.get(User, int(session["user_id"]))
+        g._current_user = user
+    return user
+
+
+@app.teardown_request
+def _drop_cached_user(exc=None):
+    g.pop("_current_user", None)
+
+
+def login_required(view):
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        if "user_id" not in session:
+            flash("Please log in first.", "warning")
+            return redirect(url_for("login"))
+        if get_current_user() is None:
+            session.clear()
+            return redirect(url_for("login"))
+        # ensure_sync lets the decorator wrap async views too (it runs
+        # the coroutine to completion; plain functions pass through).
+        return app.ensure_sync(view)(*args, **kwargs)
+
+    return wrapped
+
+
+@app.context_processor
+def inject_current_user():
+    return {"current_user": get_current_user()}
+
+
+@app.context_processor
+def inject_user_role_info():
+    user = get_current_user()
+    role = user.role if user is not None else None
+    return {"user_role": role, "is_admin": role == "admin"}
+
+
+# Neither answer changes during a process's lifetime, so stat the built
+# CSS bundle and read the env exactly once instead of per render.
+_BUILT_CSS = os.path.exists(os.path.join(app.root_path, "static", "dist", "main.css"))
+_IS_PROD = (
+    os.getenv("RAILWAY_ENVIRONMENT") is not None
+    or os.getenv("FLASK_ENV") == "production"
+    or os.getenv("ENV") == "production"
+)
+_BUILD_INFO = {"built_css": _BUILT_CSS, "is_production": _IS_PROD}
+
+
+@app.context_processor
+def inject_build_info():
+    return _BUILD_INFO
+
+
+_IST = ZoneInfo("Asia/Kolkata")
+
+
+@app.template_filter("format_backup_timestamp")
+@lru_cache(maxsize=4096)
+def format_backup_timestamp_filter(value):
+    """Render backup ISO timestamps as IST for the backup page.
+
+    Backup listings repeat the same handful of timestamps across rows
+    and page loads, so conversions are memoized on the raw string.
+    """
+    if not value:
+        return "-"
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return value
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(_IST).strftime("%d %b %Y, %H:%M IST")
+
+
+@lru_cache(maxsize=4096)
+def _format_feed_timestamp(ts):
+    """IST display string for an update timestamp.
+
+    Update timestamps only change when a row is edited, so the cache
+    key (the datetime itself) stays valid across requests and repeat
+    feed renders skip astimezone/strftime entirely.
+    """
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(_IST).strftime("%d/%m/%Y, %H:%M:%S")
+
+
+# Audit rows don't need to be durably committed before the response goes
+# out, so they are queued here and flushed by a background thread in
+# batches (every ~100ms or 500 rows) via a single executemany INSERT.
+_ACTIVITY_QUEUE = queue.Queue()
+_ACTIVITY_FLUSH_INTERVAL = 0.1
+_ACTIVITY_BATCH_MAX = 500
+_activity_writer_started = False
+_activity_writer_lock = threading.Lock()
+
+
+def _activity_writer():
+    insert_stmt = ActivityLog.__table__.insert()
+    while True:
+        rows = [_ACTIVITY_QUEUE.get()]
+        deadline = time.monotonic() + _ACTIVITY_FLUSH_INTERVAL
+        while len(rows) < _ACTIVITY_BATCH_MAX:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                rows.append(_ACTIVITY_QUEUE.get(timeout=remaining))
+            except queue.Empty:
+                break
+        try:
+            with app.app_context():
+                db.session.execute(insert_stmt, rows)
+                db.session.commit()
+        except Exception:
+            app.logger.exception("failed to flush %d activity log rows", len(rows))
+
+
+def _ensure_activity_writer():
+    # Started lazily (on first audit row) so the thread is created after
+    # gunicorn forks, not at import time in the master process.
+    global _activity_writer_started
+    if _activity_writer_started:
+        return
+    with _activity_writer_lock:
+        if not _activity_writer_started:
+            threading.Thread(
+                target=_activity_writer, name="activity-writer", daemon=True
+            ).start()
+            _activity_writer_started = True
+
+
+def log_activity(action, details=None):
+    """Queue an audit row for asynchronous insertion.
+
+    Request-bound data (user, IP, user agent) is captured here on the
+    request thread; only the DB write happens on the background writer,
+    so write endpoints no longer pay the audit insert's latency.
+    """
+    user_id = session.get("user_id")
+    username = session.get("display_name", "Anonymous")
+    xff = request.environ.get("HTTP_X_FORWARDED_FOR")
+    if xff:
+        client_ip = xff.split(",", 1)[0].strip()
+    else:
+        client_ip = request.remote_addr or "Unknown"
+    user_agent = request.headers.get("User-Agent", "Unknown")[:255]
+
+    _ACTIVITY_QUEUE.put(
+        {
+            "user_id": user_id,
+            "username": username,
+            "action": action,
+            "details": details,
+            "ip_address": client_ip,
+            "user_agent": user_agent,
+            "timestamp": now_utc(),
+        }
+    )
+    _ensure_activity_writer()
+
+
+# ---------------------------------------------------------------------------
+# core pages
+# ---------------------------------------------------------------------------
+
+def _cached_json(key, ttl, loader):
+    """Serve loader() results from Redis for ttl seconds.
+
+    Values are stored as orjson-encoded plain dicts, so cache hits never
+    touch SQLAlchemy at all. Degrades to calling loader() directly when
+    Redis is unconfigured or down.
+    """
+    client = get_redis()
+    if client is not None:
+        try:
+            cached = client.get(key)
+            if cached is not None:
+                return _json_loads(cached)
+        except Exception:
+            client = None
+    data = loader()
+    if client is not None:
+        try:
+            client.setex(key, ttl, _json_dumps(data))
+        except Exception:
+            pass
+    return data
+
+
+def _invalidate_cache(*keys):
+    client = get_redis()
+    if client is not None:
+        try:
+            client.delete(*keys)
+        except Exception:
+            pass
+
+
+HOME_CACHE_TTL = 60
+HOME_LIST_LIMIT = int(os.getenv("HOME_LIST_LIMIT", "50"))
+SEARCH_LIMIT = int(os.getenv("SEARCH_LIMIT", "50"))
+LIST_PAGE_SIZE = 50
+HOME_UPDATES_KEY = "home:updates_latest:v1"
+HOME_SOPS_KEY = "home:sops:v1"
+HOME_LESSONS_KEY = "home:lessons:v1"
+
+
+_TEMPLATE_CACHE = {}
+
+
+def render_cached(template_name, **context):
+    """render_template minus the per-request template-loader lookup.
+
+    Fetches the compiled Template object once per process and reuses it on
+    later requests; context processors still run via
+    update_template_context, so templates see the same context they would
+    get from render_template.
+    """
+    template = _TEMPLATE_CACHE.get(template_name)
+    if template is None:
+        template = app.jinja_env.get_template(template_name)
+        _TEMPLATE_CACHE[template_name] = template
+    app.update_template_context(context)
+    return template.render(context)
+
+
+def _load_home_updates():
+    return [
+        {"id": u.id, "name": u.name, "process": u.process, "message": u.message}
+        for u in Update.query.order_by(Update.timestamp.desc()).limit(5)
+    ]
+
+
+def _load_home_sops():
+    return [
+        {"id": s.id, "title": s.title, "department": s.department}
+        for s in SOPSummary.query.order_by(SOPSummary.created_at.desc()).limit(
+            HOME_LIST_LIMIT
+        )
+    ]
+
+
+def _load_home_lessons():
+    return [
+        {"id": l.id, "title": l.title}
+        for l in LessonLearned.query.order_by(LessonLearned.created_at.desc()).limit(
+            HOME_LIST_LIMIT
+        )
+    ]
+
+
+@app.route("/")
+def home():
+    latest_updates = _cached_json(HOME_UPDATES_KEY, HOME_CACHE_TTL, _load_home_updates)
+    sop_summaries = _cached_json(HOME_SOPS_KEY, HOME_CACHE_TTL, _load_home_sops)
+    lessons = _cached_json(HOME_LESSONS_KEY, HOME_CACHE_TTL, _load_home_lessons)
+    return render_cached(
+        "home.html",
+        latest_updates=latest_updates,
+        sop_summaries=sop_summaries,
+        lessons=lessons,
+    )
+
+
+FEED_CACHE_PREFIX = "updates:v1:"
+FEED_CACHE_TTL = 60
+FEED_VERSION_KEY = "updates:feed_ver"
+
+
+def _bump_feed_version():
+    """Roll the feed version so stale ETags and cache keys stop matching.
+
+    The newest-timestamp stamp alone misses mutations that don't move
+    max(timestamp) — deleting a non-newest row, restoring from the
+    archive, marking reads — so every feed mutation bumps this too.
+    """
+    try:
+        cache.set(FEED_VERSION_KEY, time.time_ns(), timeout=0)
+    except Exception:
+        pass
+
+
+def _feed_version():
+    try:
+        return cache.get(FEED_VERSION_KEY) or 0
+    except Exception:
+        return 0
+FEED_PAGE_SIZE = 50
+
+
+@app.route("/updates")
+def show_updates():
+    current_time = datetime.now(timezone.utc)
+
+    # Keyset pagination: the cursor is the timestamp of the last row on
+    # the previous page, so every page is a cheap index range scan —
+    # no OFFSET walk, and memory stays bounded however large the table
+    # grows.
+    cursor = None
+    raw_cursor = request.args.get("cursor")
+    if raw_cursor:
+        try:
+            cursor = datetime.fromisoformat(raw_cursor)
+        except ValueError:
+            cursor = None
+
+    # ETag from the newest timestamp plus the feed version (bumped on
+    # every mutation, covering deletes and read marks the stamp alone
+    # misses) lets clients skip the whole query + render cycle with a
+    # 304. Scoped per user since the navbar differs for logged-in
+    # users, and per cursor page. A 304 has no body, so it would
+    # swallow a pending flash (e.g. the redirect after a delete) —
+    # render normally while flashes wait.
+    latest_ts = db.session.query(func.max(Update.timestamp)).scalar()
+    stamp = int(ensure_timezone(latest_ts).timestamp()) if latest_ts else 0
+    feed_ver = _feed_version()
+    etag = f"{stamp}-{feed_ver}-{raw_cursor or ''}-{session.get('user_id', 0)}"
+    if request.if_none_match.contains(etag) and not session.get("_flashes"):
+        return "", 304
+
+    # Server-side cache of the shaped feed, self-keyed on the newest
+    # timestamp plus the feed version: any mutation rolls one of the
+    # two (deletes and read marks move only the version), so there is
+    # no invalidation to forget and stale entries simply age out via
+    # the TTL. User-specific bits (navbar, flashes) stay out of the
+    # payload, so one entry serves every viewer.
+    feed_key = f"{FEED_CACHE_PREFIX}{stamp}:{feed_ver}:{raw_cursor or ''}"
+    cached_feed = cache.get(feed_key)
+    if cached_feed is not None:
+        updates, next_cursor, unique_authors, processes, updates_this_week = cached_feed
+    else:
+        # "is_new" is a trivial boolean the DB can materialize during
+        # the scan it already does, instead of per-row Python datetime
+        # arithmetic. Read counts come off the denormalized
+        # updates.read_count column, so the old LEFT JOIN read_logs ...
+        # GROUP BY is gone from the hot path. Selecting columns rather
+        # than Update entities skips ORM hydration and identity-map
+        # bookkeeping per row — the feed never mutates what it reads.
+        new_cutoff = current_time - timedelta(hours=24)
+        feed_q = db.session.query(
+            Update.id,
+            Update.name,
+            Update.process,
+            Update.message,
+            Update.timestamp,
+            Update.read_count,
+            (Update.timestamp >= new_cutoff).label("is_new"),
+        )
+        if cursor is not None:
+            feed_q = feed_q.filter(Update.timestamp < cursor)
+        # One row past the page size tells us whether an older page
+        # exists without a separate count.
+        results = (
+            feed_q.order_by(Update.timestamp.desc())
+            .limit(FEED_PAGE_SIZE + 1)
+            .all()
+        )
+        has_more = len(results) > FEED_PAGE_SIZE
+        results = results[:FEED_PAGE_SIZE]
+
+        # Shape rows inline rather than via Update.to_dict, which
+        # re-derived the timezone handling per row and built a dict we
+        # then had to extend anyway.
+        updates = []
+        for row in results:
+            updates.append(
+                {
+                    "id": row.id,
+                    "name": row.name,
+                    "process": row.process,
+                    "message": row.message,
+                    "timestamp": _format_feed_timestamp(row.timestamp)
+                    if row.timestamp
+                    else None,
+                    "read_count": row.read_count,
+                    "is_new": bool(row.is_new),
+                    "timestamp_obj": row.timestamp,
+                }
+            )
+
+        # Sidebar stats come straight from the DB instead of a second
+        # full table scan plus O(N) Python loops over every Update row.
+        unique_authors = [
+            name for (name,) in db.session.query(Update.name).distinct() if name
+        ]
+        processes = [
+            proc for (proc,) in db.session.query(Update.process).distinct() if proc
+        ]
+        week_cutoff = current_time - timedelta(days=7)
+        updates_this_week = (
+            db.session.query(func.count())
+            .select_from(Update)
+            .filter(Update.timestamp >= week_cutoff)
+            .scalar()
+        )
+        next_cursor = None
+        if has_more and updates:
+            next_cursor = ensure_timezone(updates[-1]["timestamp_obj"]).isoformat()
+        cache.set(
+            feed_key,
+            (updates, next_cursor, unique_authors, processes, updates_this_week),
+            timeout=FEED_CACHE_TTL,
+        )
+
+    response = make_response(
+        render_cached(
+            "show.html",
+            updates=updates,
+            next_cursor=next_cursor,
+            unique_authors=sorted(unique_authors),
+            processes=sorted(processes),
+            updates_this_week=updates_this_week,
+        )
+    )
+    response.set_etag(etag)
+    return response
+
+
+@app.route("/updates/<update_id>")
+@login_required
+def view_update(update_id):
+    if not _is_update_id(update_id):
+        flash("Update not found.", "danger")
+        return redirect(url_for("show_updates"))
+    # Row, read count and "have I read it" come back in one SELECT with
+    # correlated subqueries instead of three round-trips.
+    count_sq = (
+        select(func.count(ReadLog.id))
+        .where(ReadLog.update_id == update_id)
+        .scalar_subquery()
+    )
+    is_read_sq = (
+        select(ReadLog.id)
+        .where(ReadLog.update_id == update_id, ReadLog.user_id == session["user_id"])
+        .exists()
+    )
+    # selectinload fetches the reader list the template walks up front;
+    # otherwise the lazy load fires mid-render.
+    row = db.session.execute(
+        select(Update, count_sq.label("read_count"), is_read_sq.label("is_read"))
+        .options(selectinload(Update.read_logs))
+        .where(Update.id == update_id)
+    ).first()
+    if row is None:
+        flash("Update not found.", "danger")
+        return redirect(url_for("show_updates"))
+
+    return render_template(
+        "view_update.html",
+        update=row.Update,
+        read_count=row.read_count,
+        is_read=bool(row.is_read),
+    )
+
+
+@app.route("/post", methods=["GET", "POST"])
+@login_required
+def post_update():
+    current = get_current_user()
+    name = current.display_name
+
+    if request.method == "POST":
+        selected_process = request.form.get("process", "").strip()
+        message = request.form.get("message", "").strip()
+
+        if name not in AUTHORIZED_USERS:
+            flash("You are not authorized to post updates.", "danger")
+            return redirect(url_for("show_updates"))
+        if selected_process not in AVAILABLE_PROCESSES or not message:
+            flash("Pick a process and write a message.", "warning")
+            return render_template("post.html", processes=AVAILABLE_PROCESSES)
+
+        if db.engine.dialect.name == "postgresql":
+            # Server-side defaults (_ensure_insert_defaults) mint id and
+            # timestamp inside the INSERT; RETURNING hands them back in
+            # the same round-trip, so Python allocates neither.
+            new_id, new_ts = db.session.execute(
+                text(
+                    "INSERT INTO updates (name, process, message) "
+                    "VALUES (:name, :process, :message) "
+                    "RETURNING id, timestamp"
+                ),
+                {"name": name, "process": selected_process, "message": message},
+            ).one()
+        else:
+            new_id = str(uuid.uuid4())
+            new_ts = datetime.now(timezone.utc)
+            db.session.add(
+                Update(
+                    id=new_id,
+                    name=name,
+                    process=selected_process,
+                    message=message,
+                    timestamp=new_ts,
+                )
+            )
+        update_data = {
+            "id": new_id,
+            "name": name,
+            "process": selected_process,
+            "message": message,
+            "timestamp": ensure_timezone(new_ts).isoformat(),
+        }
+        log_activity("post_update", f"Posted update for {selected_process}")
+        db.session.commit()
+        _bump_feed_version()
+        _invalidate_cache(HOME_UPDATES_KEY)
+        _invalidate_api_caches()
+        _publish_latest_update_ts(new_ts)
+        try:
+            from api.socketio import queue_update
+
+            queue_update(update_data, selected_process)
+        except Exception:
+            app.logger.warning("socket broadcast failed", exc_info=True)
+
+        flash("Update posted.", "success")
+        return redirect(url_for("show_updates"))
+
+    return render_template("post.html", processes=AVAILABLE_PROCESSES)
+
+
+def _is_update_id(value):
+    """True when value parses as a uuid.
+
+    updates.id is a native uuid column on Postgres; comparing it against
+    a malformed path/form id raises DataError (a 500) where the old
+    varchar column simply matched nothing. Reject junk before it
+    reaches SQL so those requests keep getting the not-found flash.
+    """
+    try:
+        uuid.UUID(value)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def _owned_update_filter(update_id, current):
+    """WHERE clause matching an update the current user may modify."""
+    return (
+        Update.id == update_id,
+        func.lower(Update.name) == current.display_name.strip().lower(),
+    )
+
+
+@app.route("/updates/<update_id>/edit", methods=["GET", "POST"])
+@login_required
+def edit_update(update_id):
+    if not _is_update_id(update_id):
+        flash("Update not found.", "danger")
+        return redirect(url_for("show_updates"))
+    current = get_current_user()
+
+    if request.method == "POST":
+        new_message = request.form.get("message", "").strip()
+        if not new_message:
+            flash("Message cannot be empty.", "warning")
+            return redirect(url_for("edit_update", update_id=update_id))
+        # Ownership check folded into the UPDATE itself: one round-trip,
+        # no row hydrated into the session, rowcount tells us whether the
+        # update existed and belonged to this user.
+        new_ts = datetime.now(timezone.utc)
+        res = db.session.execute(
+            sa_update(Update)
+            .where(*_owned_update_filter(update_id, current))
+            .values(message=new_message, timestamp=new_ts)
+        )
+        if res.rowcount == 0:
+            db.session.rollback()
+            flash("You can only edit your own updates.", "danger")
+            return redirect(url_for("show_updates"))
+        log_activity("edit_update", f"Edited update {update_id}")
+        db.session.commit()
+        _bump_feed_version()
+        _invalidate_cache(HOME_UPDATES_KEY)
+        _invalidate_api_caches()
+        _publish_latest_update_ts(new_ts)
+        flash("Update edited.", "success")
+        return redirect(url_for("show_updates"))
+
+    # The form only renders the message; skip shipping the other
+    # columns just to throw them away.
+    update = db.session.execute(
+        select(Update)
+        .options(load_only(Update.id, Update.message))
+        .where(*_owned_update_filter(update_id, current))
+    ).scalar_one_or_none()
+    if update is None:
+        flash("You can only edit your own updates.", "danger")
+        return redirect(url_for("show_updates"))
+    return render_template("edit_update.html", update=update)
+
+
+def _archive_and_delete(model, archive_model, where_clauses, archived_by):
+    """Move matching rows into the archive table entirely DB-side.
+
+    On Postgres this is a single data-modifying CTE (DELETE ... RETURNING
+    feeding the INSERT), so archive and delete are one atomic statement.
+    SQLite has no DML CTEs, so it gets INSERT ... SELECT followed by
+    DELETE inside the same transaction. Either way nothing is hydrated
+    into the ORM just to be copied and thrown away. Returns the number
+    of rows moved (0 means not found / not authorized); the caller
+    commits or rolls back.
+    """
+    src = model.__table__
+    dst = archive_model.__table__
+    # Copy every column both tables share, except autoincrement archive
+    # PKs (the integer archives mint their own ids).
+    shared = [
+        c.name
+        for c in src.columns
+        if c.name in dst.columns
+        and not (dst.c[c.name].primary_key and isinstance(dst.c[c.name].type, Integer))
+    ]
+    dest_cols = shared + ["archived_at", "archived_by"]
+    extras = [literal(now_utc()), literal(archived_by)]
+
+    if db.engine.dialect.name == "postgresql":
+        deleted = sa_delete(src).where(*where_clauses).returning(*
+            [src.c[name] for name in shared]
+        ).cte("deleted_rows")
+        res = db.session.execute(
+            dst.insert().from_select(
+                dest_cols,
+                select(*[deleted.c[name] for name in shared], *extras),
+            )
+        )
+        return res.rowcount
+
+    db.session.execute(
+        dst.insert().from_select(
+            dest_cols,
+            select(*[src.c[name] for name in shared], *extras).where(*where_clauses),
+        )
+    )
+    return db.session.execute(sa_delete(src).where(*where_clauses)).rowcount
+
+
+@app.route("/updates/<update_id>/delete", methods=["POST"])
+@login_required
+def delete_update(update_id):
+    if not _is_update_id(update_id):
+        flash("Update not found.", "danger")
+        return redirect(url_for("show_updates"))
+    current = get_current_user()
+    owned = _owned_update_filter(update_id, current)
+    # Read logs must go first (they reference updates.id); the subquery
+    # keeps the delete scoped to an update this user actually owns.
+    db.session.execute(
+        sa_delete(ReadLog).where(
+            ReadLog.update_id.in_(select(Update.id).where(*owned))
+        )
+    )
+    moved = _archive_and_delete(Update, ArchivedUpdate, owned, current.display_name)
+    if moved == 0:
+        db.session.rollback()
+        flash("You can only delete your own updates.", "danger")
+        return redirect(url_for("show_updates"))
+
+    log_activity("delete_update", f"Deleted update {update_id}")
+    db.session.commit()
+    _bump_feed_version()
+    _invalidate_cache(HOME_UPDATES_KEY)
+    _invalidate_api_caches()
+    flash("Update archived and deleted.", "success")
+    return redirect(url_for("show_updates"))
+
+
+# Expressions here must match the GIN indexes created in
+# _ensure_search_indexes exactly, or Postgres won't use them.
+_SEARCH_SQL = """
+SELECT kind, id, title, snippet FROM (
+    SELECT 'update' AS kind, id::text AS id,
+           process || ' — ' || name AS title,
+           left(message, 160) AS snippet,
+           ts_rank_cd(to_tsvector('english',
+               coalesce(message,'') || ' ' || name || ' ' || process),
+               websearch_to_tsquery('english', :q)) AS rank
+    FROM updates
+    WHERE to_tsvector('english',
+              coalesce(message,'') || ' ' || name || ' ' || process)
+          @@ websearch_to_tsquery('english', :q)
+       OR message ILIKE :pat
+    UNION ALL
+    SELECT 'sop', id::text, title, left(summary_text, 160),
+           ts_rank_cd(to_tsvector('english',
+               coalesce(title,'') || ' ' || coalesce(summary_text,'')
+               || ' ' || coalesce(tags,'')),
+               websearch_to_tsquery('english', :q))
+    FROM sop_summaries
+    WHERE to_tsvector('english',
+              coalesce(title,'') || ' ' || coalesce(summary_text,'')
+              || ' ' || coalesce(tags,''))
+          @@ websearch_to_tsquery('english', :q)
+       OR title ILIKE :pat OR summary_text ILIKE :pat
+    UNION ALL
+    SELECT 'lesson', id::text, title, left(content, 160),
+           ts_rank_cd(to_tsvector('english',
+               coalesce(title,'') || ' ' || coalesce(content,'')),
+               websearch_to_tsquery('english', :q))
+    FROM lessons_learned
+    WHERE to_tsvector('english',
+              coalesce(title,'') || ' ' || coalesce(content,''))
+          @@ websearch_to_tsquery('english', :q)
+       OR title ILIKE :pat OR content ILIKE :pat
+) matches
+ORDER BY rank DESC
+LIMIT :limit
+"""
+
+
+def _search_fulltext(query):
+    """One indexed UNION ALL round-trip across all three tables (Postgres)."""
+    rows = db.session.execute(
+        text(_SEARCH_SQL),
+        {"q": query, "pat": f"%{query}%", "limit": SEARCH_LIMIT}
+    ).mappings()
+    return [dict(row) for row in rows]
+
+
+# Built once with a shared bindparam so the compiled-query cache keys on
+# structure, not on each user's search string.
+_ILIKE_Q = bindparam("q")
+_ILIKE_UPDATE = db.or_(
+    Update.message.ilike(_ILIKE_Q),
+    Update.name.ilike(_ILIKE_Q),
+    Update.process.ilike(_ILIKE_Q),
+)
+_ILIKE_SOP = db.or_(
+    SOPSummary.title.ilike(_ILIKE_Q),
+    SOPSummary.summary_text.ilike(_ILIKE_Q),
+    SOPSummary.tags.ilike(_ILIKE_Q),
+)
+_ILIKE_LESSON = db.or_(
+    LessonLearned.title.ilike(_ILIKE_Q),
+    LessonLearned.content.ilike(_ILIKE_Q),
+)
+
+
+def _search_ilike(query):
+    """Sequential-scan fallback for SQLite (dev/test)."""
+    query_filter = f"%{query}%"
+    results = []
+    for upd in (
+        Update.query.filter(_ILIKE_UPDATE)
+        .params(q=query_filter)
+        .order_by(Update.timestamp.desc())
+        .limit(SEARCH_LIMIT)
+    ):
+        results.append(
+            {
+                "kind": "update",
+                "id": upd.id,
+                "title": f"{upd.process} — {upd.name}",
+                "snippet": upd.message[:160],
+            }
+        )
+    for sop in (
+        SOPSummary.query.filter(_ILIKE_SOP)
+        .params(q=query_filter)
+        .order_by(SOPSummary.created_at.desc())
+        .limit(SEARCH_LIMIT)
+    ):
+        results.append(
+            {
+                "kind": "sop",
+                "id": sop.id,
+                "title": sop.title,
+                "snippet": sop.summary_text[:160],
+            }
+        )
+    for lesson in (
+        LessonLearned.query.filter(_ILIKE_LESSON)
+        .params(q=query_filter)
+        .order_by(LessonLearned.created_at.desc())
+        .limit(SEARCH_LIMIT)
+    ):
+        results.append(
+            {
+                "kind": "lesson",
+                "id": lesson.id,
+                "title": lesson.title,
+                "snippet": lesson.content[:160],
+            }
+        )
+    return results
+
+
+_SEARCH_URLS = {
+    "update": lambda item_id: url_for("view_update", update_id=item_id),
+    "sop": lambda item_id: url_for("view_sop_summary", sop_id=item_id),
+    "lesson": lambda item_id: url_for("view_lesson_learned", lesson_id=item_id),
+}
+
+
+@app.route("/search")
+def search():
+    query = request.args.get("q", "").strip()
+    results = []
+    if query:
+        if db.engine.dialect.name == "postgresql":
+            results = _search_fulltext(query)
+        else:
+            results = _search_ilike(query)
+        for row in results:
+            row["url"] = _SEARCH_URLS[row["kind"]](row["id"])
+
+    return render_template(
+        "search.html",
+        query=query,
+        updates=[r for r in results if r["kind"] == "update"],
+        sops=[r for r in results if r["kind"] == "sop"],
+        lessons=[r for r in results if r["kind"] == "lesson"],
+    )
+
+
+# ---------------------------------------------------------------------------
+# auth routes
+# ---------------------------------------------------------------------------
+
+# Charset check via frozenset — same ASCII rule as the old regex without
+# running the regex engine on every registration attempt.
+_USERNAME_CHARS = frozenset(string.ascii_letters + string.digits + "_")
+
+# PBKDF2 hashing burns ~100ms of pure C CPU per call. Under the gevent
+# worker wsgi.py configures, monkey.patch_all() turns ThreadPoolExecutor
+# workers into greenlets — submitting there would still pin the event
+# loop — so when threading is patched the work goes to the hub's native
+# thread pool instead (real OS threads; PBKDF2's C code releases the
+# GIL, so other greenlets keep serving). Calls block the caller either
+# way — this buys concurrency, not latency.
+try:
+    from gevent import monkey as _gevent_monkey
+
+    _GEVENT_THREADS_PATCHED = _gevent_monkey.is_module_patched("threading")
+except ImportError:
+    _GEVENT_THREADS_PATCHED = False
+
+if _GEVENT_THREADS_PATCHED:
+
+    def _call_in_native_thread(fn, *args):
+        from gevent import get_hub
+
+        return get_hub().threadpool.apply(fn, args)
+
+else:
+    _NATIVE_POOL = ThreadPoolExecutor(
+        max_workers=os.cpu_count() or 2, thread_name_prefix="native"
+    )
+
+    def _call_in_native_thread(fn, *args):
+        return _NATIVE_POOL.submit(fn, *args).result()
+
+
+@app.route("/register", methods=["GET", "POST"])
+def register():
+    if request.method == "POST":
+        username = request.form.get("username", "").strip().lower()
+        display_name = request.form.get("display_name", "").strip()
+        password = request.form.get("password", "")
+
+        if not username or not _USERNAME_CHARS.issuperset(username):
+            flash("Username may only contain letters, digits and underscores.", "warning")
+            return render_template("register.html")
+        if not display_name or len(password) < 8:
+            flash("Display name required; password must be 8+ characters.", "warning")
+            return render_template("register.html")
+        if User.query.filter_by(username=username).first() is not None:
+            flash("Username already taken.", "warning")
+            return render_template("register.html")
+
+        user = User(username=username, display_name=display_name)
+        _call_in_native_thread(user.set_password, password)
+        db.session.add(user)
+        db.session.commit()
+        flash("Account created — please log in.", "success")
+        return redirect(url_for("login"))
+
+    return render_template("register.html")
+
+
+@app.route("/login", methods=["GET", "POST"])
+def login():
+    if request.method == "POST":
+        username = request.form.get("username", "").strip().lower()
+        password = request.form.get("password", "")
+
+        user = User.query.filter_by(username=username).first()
+        if user is None or not _call_in_native_thread(user.check_password, password):
+            flash("Invalid username or password.", "danger")
+            return render_template("login.html")
+
+        session["user_id"] = user.id
+        session["display_name"] = user.display_name
+        token = _cache_session_user(user)
+        if token:
+            session["auth_token"] = token
+        log_activity("login", f"{user.username} logged in")
+        return redirect(url_for("home"))
+
+    return render_template("login.html")
+
+
+@app.route("/logout")
+def logout():
+    if "user_id" in session:
+        log_activity("logout", "User logged out")
+    token = session.get("auth_token")
+    if token:
+        _invalidate_cache(_session_cache_key(token))
+    session.clear()
+    flash("Logged out.", "info")
+    return redirect(url_for("home"))
+
+
+# ---------------------------------------------------------------------------
+# SOP summaries
+# ---------------------------------------------------------------------------
+
+@app.route("/sops")
+def list_sop_summaries():
+    # The list renders title/department/author/tags only — load_only
+    # keeps the big summary_text TEXT column off the wire. Pages of
+    # LIST_PAGE_SIZE bound memory; the extra row answers has_next
+    # without a count query.
+    page = max(request.args.get("page", 1, type=int), 1)
+    sops = (
+        SOPSummary.query.options(
+            load_only(
+                SOPSummary.id,
+                SOPSummary.title,
+                SOPSummary.department,
+                SOPSummary.created_by,
+                SOPSummary.tags,
+                SOPSummary.created_at,
+            )
+        )
+        .order_by(SOPSummary.created_at.desc())
+        .offset((page - 1) * LIST_PAGE_SIZE)
+        .limit(LIST_PAGE_SIZE + 1)
+        .all()
+    )
+    has_next = len(sops) > LIST_PAGE_SIZE
+    return render_template(
+        "sop_summaries.html", sops=sops[:LIST_PAGE_SIZE], page=page, has_next=has_next
+    )
+
+
+@app.route("/sops/<int:sop_id>")
+def view_sop_summary(sop_id):
+    sop = db.session.get(SOPSummary, sop_id)
+    if sop is None:
+        flash("SOP summary not found.", "danger")
+        return redirect(url_for("list_sop_summaries"))
+    return render_template("view_sop_summary.html", sop=sop)
+
+
+@app.route("/sops/add", methods=["GET", "POST"])
+@login_required
+def add_sop_summary():
+    if request.method == "POST":
+        current = get_current_user()
+        sop = SOPSummary(
+            title=request.form.get("title", "").strip(),
+            department=request.form.get("department", "").strip(),
+            summary_text=request.form.get("summary_text", "").strip(),
+            tags=request.form.get("tags", "").strip(),
+            created_by=current.display_name,
+            created_at=now_utc(),
+        )
+        if not sop.title or not sop.summary_text:
+            flash("Title and summary are required.", "warning")
+            return render_template("sop_form.html", sop=None)
+        db.session.add(sop)
+        log_activity("add_sop_summary", f"Added SOP summary: {sop.title}")
+        db.session.commit()
+        _invalidate_cache(HOME_SOPS_KEY)
+        try:
+            from api.socketio import queue_notification
+
+            queue_notification("sop", {"id": sop.id, "title": sop.title})
+        except Exception:
+            app.logger.warning("socket broadcast failed", exc_info=True)
+        flash("SOP summary added.", "success")
+        return redirect(url_for("list_sop_summaries"))
+
+    return render_template("sop_form.html", sop=None)
+
+
+@app.route("/sops/<int:sop_id>/edit", methods=["GET", "POST"])
+@login_required
+def edit_sop_summary(sop_id):
+    current = get_current_user()
+    sop = db.session.get(SOPSummary, sop_id)
+    if sop is None:
+        flash("SOP summary not found.", "danger")
+        return redirect(url_for("list_sop_summaries"))
+    if sop.created_by != current.display_name and current.role != "admin":
+        flash("You can only edit your own SOP summaries.", "danger")
+        return redirect(url_for("list_sop_summaries"))
+
+    if request.method == "POST":
+        sop.title = request.form.get("title", sop.title).strip()
+        sop.department = request.form.get("department", sop.department or "").strip()
+        sop.summary_text = request.form.get("summary_text", sop.summary_text).strip()
+        sop.tags = request.form.get("tags", sop.tags or "").strip()
+        log_activity("edit_sop_summary", f"Edited SOP summary {sop_id}")
+        db.session.commit()
+        _invalidate_cache(HOME_SOPS_KEY)
+        flash("SOP summary updated.", "success")
+        return redirect(url_for("view_sop_summary", sop_id=sop_id))
+
+    return render_template("sop_form.html", sop=sop)
+
+
+@app.route("/sops/<int:sop_id>/delete", methods=["POST"])
+@login_required
+def delete_sop_summary(sop_id):
+    current = get_current_user()
+    where = [SOPSummary.id == sop_id]
+    if current.role != "admin":
+        where.append(SOPSummary.created_by == current.display_name)
+    moved = _archive_and_delete(
+        SOPSummary, ArchivedSOPSummary, where, current.display_name
+    )
+    if moved == 0:
+        db.session.rollback()
+        flash("You can only delete your own SOP summaries.", "danger")
+        return redirect(url_for("list_sop_summaries"))
+
+    log_activity("delete_sop_summary", f"Deleted SOP summary {sop_id}")
+    db.session.commit()
+    _invalidate_cache(HOME_SOPS_KEY)
+    flash("SOP summary archived and deleted.", "success")
+    return redirect(url_for("list_sop_summaries"))
+
+
+# ---------------------------------------------------------------------------
+# lessons learned
+# ---------------------------------------------------------------------------
+
+@app.route("/lessons")
+def list_lessons_learned():
+    # content is the heavyweight column and the list never shows it.
+    page = max(request.args.get("page", 1, type=int), 1)
+    lessons = (
+        LessonLearned.query.options(
+            load_only(
+                LessonLearned.id,
+                LessonLearned.title,
+                LessonLearned.department,
+                LessonLearned.summary,
+                LessonLearned.created_by,
+                LessonLearned.created_at,
+            )
+        )
+        .order_by(LessonLearned.created_at.desc())
+        .offset((page - 1) * LIST_PAGE_SIZE)
+        .limit(LIST_PAGE_SIZE + 1)
+        .all()
+    )
+    has_next = len(lessons) > LIST_PAGE_SIZE
+    return render_template(
+        "lessons_learned.html",
+        lessons=lessons[:LIST_PAGE_SIZE],
+        page=page,
+        has_next=has_next,
+    )
+
+
+@app.route("/lessons/<int:lesson_id>")
+def view_lesson_learned(lesson_id):
+    lesson = db.session.get(LessonLearned, lesson_id)
+    if lesson is None:
+        flash("Lesson not found.", "danger")
+        return redirect(url_for("list_lessons_learned"))
+    return render_template("view_lesson_learned.html", lesson=lesson)
+
+
+@app.route("/lessons/add", methods=["GET", "POST"])
+@login_required
+def add_lesson_learned():
+    if request.method == "POST":
+        current = get_current_user()
+        lesson = LessonLearned(
+            title=request.form.get("title", "").strip(),
+            department=request.form.get("department", "").strip(),
+            summary=request.form.get("summary", "").strip(),
+            content=request.form.get("content", "").strip(),
+            created_by=current.display_name,
+            created_at=now_utc(),
+        )
+        if not lesson.title or not lesson.content:
+            flash("Title and content are required.", "warning")
+            return render_template("lesson_form.html", lesson=None)
+        db.session.add(lesson)
+        log_activity("add_lesson_learned", f"Added lesson: {lesson.title}")
+        db.session.commit()
+        _invalidate_cache(HOME_LESSONS_KEY)
+        try:
+            from api.socketio import queue_notification
+
+            queue_notification("lesson", {"id": lesson.id, "title": lesson.title})
+        except Exception:
+            app.logger.warning("socket broadcast failed", exc_info=True)
+        flash("Lesson added.", "success")
+        return redirect(url_for("list_lessons_learned"))
+
+    return render_template("lesson_form.html", lesson=None)
+
+
+@app.route("/lessons/<int:lesson_id>/edit", methods=["GET", "POST"])
+@login_required
+def edit_lesson_learned(lesson_id):
+    current = get_current_user()
+    lesson = db.session.get(LessonLearned, lesson_id)
+    if lesson is None:
+        flash("Lesson not found.", "danger")
+        return redirect(url_for("list_lessons_learned"))
+    if lesson.created_by != current.display_name and current.role != "admin":
+        flash("You can only edit your own lessons.", "danger")
+        return redirect(url_for("list_lessons_learned"))
+
+    if request.method == "POST":
+        lesson.title = request.form.get("title", lesson.title).strip()
+        lesson.department = request.form.get("department", lesson.department or "").strip()
+        lesson.summary = request.form.get("summary", lesson.summary or "").strip()
+        lesson.content = request.form.get("content", lesson.content).strip()
+        log_activity("edit_lesson_learned", f"Edited lesson {lesson_id}")
+        db.session.commit()
+        _invalidate_cache(HOME_LESSONS_KEY)
+        flash("Lesson updated.", "success")
+        return redirect(url_for("view_lesson_learned", lesson_id=lesson_id))
+
+    return render_template("lesson_form.html", lesson=lesson)
+
+
+@app.route("/lessons/<int:lesson_id>/delete", methods=["POST"])
+@login_required
+def delete_lesson_learned(lesson_id):
+    current = get_current_user()
+    where = [LessonLearned.id == lesson_id]
+    if current.role != "admin":
+        where.append(LessonLearned.created_by == current.display_name)
+    moved = _archive_and_delete(
+        LessonLearned, ArchivedLessonLearned, where, current.display_name
+    )
+    if moved == 0:
+        db.session.rollback()
+        flash("You can only delete your own lessons.", "danger")
+        return redirect(url_for("list_lessons_learned"))
+
+    log_activity("delete_lesson_learned", f"Deleted lesson {lesson_id}")
+    db.session.commit()
+    _invalidate_cache(HOME_LESSONS_KEY)
+    flash("Lesson archived and deleted.", "success")
+    return redirect(url_for("list_lessons_learned"))
+
+
+# ---------------------------------------------------------------------------
+# archives
+# ---------------------------------------------------------------------------
+
+ARCHIVES_PER_PAGE = 50
+
+
+@app.route("/archives")
+@login_required
+def archives_page():
+    # LIMIT/OFFSET keeps the page constant-cost as the archives grow;
+    # the cheapest row is the one never fetched. Rows stay plain Row
+    # tuples — no ORM object per archived record.
+    page = max(request.args.get("page", 1, type=int) or 1, 1)
+    offset = (page - 1) * ARCHIVES_PER_PAGE
+
+    # The three listings are independent, so they run on worker threads
+    # (own app context, own pooled connection each, same as the export
+    # loaders): page latency is max() of the queries, not their sum.
+    def _page_of(stmt):
+        with app.app_context():
+            rows = db.session.execute(
+                stmt.limit(ARCHIVES_PER_PAGE + 1).offset(offset)
+            ).all()
+        return rows[:ARCHIVES_PER_PAGE], len(rows) > ARCHIVES_PER_PAGE
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        updates_future = executor.submit(
+            _page_of,
+            select(ArchivedUpdate.__table__).order_by(
+                ArchivedUpdate.archived_at.desc()
+            ),
+        )
+        sops_future = executor.submit(
+            _page_of,
+            select(ArchivedSOPSummary.__table__).order_by(
+                ArchivedSOPSummary.archived_at.desc()
+            ),
+        )
+        lessons_future = executor.submit(
+            _page_of,
+            select(ArchivedLessonLearned.__table__).order_by(
+                ArchivedLessonLearned.archived_at.desc()
+            ),
+        )
+    archived_updates, more_updates = updates_future.result()
+    archived_sops, more_sops = sops_future.result()
+    archived_lessons, more_lessons = lessons_future.result()
+    return render_template(
+        "archives.html",
+        archived_updates=archived_updates,
+        archived_sops=archived_sops,
+        archived_lessons=archived_lessons,
+        page=page,
+        has_next=more_updates or more_sops or more_lessons,
+    )
+
+
+_ARCHIVE_MODELS = {
+    "update": (ArchivedUpdate, Update),
+    "sop": (ArchivedSOPSummary, SOPSummary),
+    "lesson": (ArchivedLessonLearned, LessonLearned),
+}
+
+
+def _restore_archived(item_type, archive_model, live_model, ids):
+    """Move archived rows back to their live table set-based.
+
+    One insert-from-select plus one filtered DELETE — no ORM objects
+    hydrated and no extra SELECT round-trip. Returns the restored count
+    (0 when none of the ids exist); caller commits.
+    """
+    if item_type != "update":
+        ids = [int(i) for i in ids if str(i).isdigit()]
+    else:
+        ids = [i for i in ids if _is_update_id(i)]
+    if not ids:
+        return 0
+    src = archive_model.__table__
+    dst = live_model.__table__
+    skip = {"archived_at", "archived_by"}
+    if item_type != "update":
+        skip.add("id")
+    shared = [
+        col.name
+        for col in src.columns
+        if col.name not in skip and col.name in dst.columns
+    ]
+    restored = db.session.execute(
+        dst.insert().from_select(
+            shared,
+            select(*(src.c[name] for name in shared)).where(src.c.id.in_(ids)),
+        )
+    ).rowcount
+    db.session.execute(sa_delete(archive_model).where(archive_model.id.in_(ids)))
+    return restored
+
+
+@app.route("/archives/<item_type>/<item_id>/restore", methods=["POST"])
+@login_required
+def restore_archived_item(item_type, item_id):
+    pair = _ARCHIVE_MODELS.get(item_type)
+    if pair is None:
+        flash("Unknown archive type.", "danger")
+        return redirect(url_for("archives_page"))
+    archive_model, live_model = pair
+
+    restored = _restore_archived(item_type, archive_model, live_model, [item_id])
+    if not restored:
+        db.session.rollback()
+        flash("Archived item not found.", "danger")
+        return redirect(url_for("archives_page"))
+
+    log_activity("restore_archived_item", f"Restored {item_type} {item_id}")
+    db.session.commit()
+    if item_type == "update":
+        _bump_feed_version()
+    _invalidate_cache(HOME_UPDATES_KEY, HOME_SOPS_KEY, HOME_LESSONS_KEY)
+    flash("Item restored.", "success")
+    return redirect(url_for("archives_page"))
+
+
+@app.route("/archives/<item_type>/restore-bulk", methods=["POST"])
+@login_required
+def restore_archived_bulk(item_type):
+    """Restore a batch of archived items in one transaction.
+
+    One insert-from-select plus one filtered DELETE replaces the
+    per-item add/delete/commit cycle of restore_archived_item when
+    many archives move back at once.
+    """
+    pair = _ARCHIVE_MODELS.get(item_type)
+    if pair is None:
+        flash("Unknown archive type.", "danger")
+        return redirect(url_for("archives_page"))
+    archive_model, live_model = pair
+
+    ids = request.form.getlist("ids")
+    if not ids:
+        payload = request.get_json(silent=True) or {}
+        ids = payload.get("ids") or []
+    if not ids:
+        flash("Nothing selected to restore.", "warning")
+        return redirect(url_for("archives_page"))
+
+    restored = _restore_archived(item_type, archive_model, live_model, ids)
+    log_activity("restore_archived_bulk", f"Restored {restored} {item_type} item(s)")
+    db.session.commit()
+    if item_type == "update":
+        _bump_feed_version()
+    _invalidate_cache(HOME_UPDATES_KEY, HOME_SOPS_KEY, HOME_LESSONS_KEY)
+    flash(f"Restored {restored} item(s).", "success")
+    return redirect(url_for("archives_page"))
+
+
+@app.route("/archives/<item_type>/<item_id>/delete", methods=["POST"])
+@login_required
+def delete_archived_item(item_type, item_id):
+    pair = _ARCHIVE_MODELS.get(item_type)
+    if pair is None:
+        flash("Unknown archive type.", "danger")
+        return redirect(url_for("archives_page"))
+    archive_model, _ = pair
+
+    valid = _is_update_id(item_id) if item_type == "update" else str(item_id).isdigit()
+    if not valid:
+        flash("Archived item not found.", "danger")
+        return redirect(url_for("archives_page"))
+
+    deleted = db.session.execute(
+        sa_delete(archive_model).where(archive_model.id == item_id)
+    ).rowcount
+    if not deleted:
+        db.session.rollback()
+        flash("Archived item not found.", "danger")
+        return redirect(url_for("archives_page"))
+
+    log_activity("delete_archived_item", f"Permanently deleted {item_type} {item_id}")
+    db.session.commit()
+    flash("Item permanently deleted.", "success")
+    return redirect(url_for("archives_page"))
+
+
+# ---------------------------------------------------------------------------
+# activity log admin
+# ---------------------------------------------------------------------------
+
+@app.route("/admin/reset-activity-logs", methods=["POST"])
+@login_required
+def reset_activity_logs():
+    current = get_current_user()
+    if current.role != "admin":
+        flash("Admins only.", "danger")
+        return redirect(url_for("home"))
+
+    count = ActivityLog.query.count()
+    if db.engine.dialect.name == "postgresql":
+        # TRUNCATE is O(1) on the table and reclaims space immediately;
+        # DELETE would scan and WAL-log every row just to drop them all.
+        db.session.execute(text("TRUNCATE TABLE activity_logs RESTART IDENTITY"))
+    else:
+        ActivityLog.query.delete()
+    db.session.commit()
+    flash(f"Cleared {count} activity log entries.", "success")
+    return redirect(url_for("home"))
+
+
+# ---------------------------------------------------------------------------
+# Excel export
+# ---------------------------------------------------------------------------
+
+# Workbooks larger than this spill from memory to disk while building.
+EXPORT_SPOOL_MAX_BYTES = int(
+    os.getenv("EXPORT_SPOOL_MAX_BYTES", str(10 * 1024 * 1024))
+)
+
+
+@app.route("/export-readlogs")
+@login_required
+def export_readlogs():
+    if not EXCEL_EXPORT_AVAILABLE:
+        flash("Excel export is unavailable on this deployment.", "warning")
+        return redirect(url_for("show_updates"))
+
+    current = get_current_user()
+    if current.role != "admin":
+        flash("Admins only.", "danger")
+        return redirect(url_for("show_updates"))
+
+    # The workbook build is minutes of blocking DB + CPU work on big
+    # tables. Under gevent, asyncio.to_thread's executor threads are
+    # greenlets and the pandas/openpyxl CPU portion would pin the hub,
+    # so the build goes through the native-thread helper instead —
+    # same one the password hashing uses.
+    def _build():
+        with app.app_context():
+            return _build_export_workbook()
+
+    output = _call_in_native_thread(_build)
+
+    log_activity("export_readlogs", "Exported read logs to Excel")
+    filename = f"readlogs_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.xlsx"
+    return send_file(
+        output,
+        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        as_attachment=True,
+        download_name=filename,
+    )
+
+
+def _build_export_workbook():
+    """Assemble the full export workbook; returns a spooled file ready
+    to stream. Runs on a worker thread inside its own app context."""
+    import numpy as np
+    import pandas as pd
+
+    from openpyxl import Workbook
+    from openpyxl.utils import get_column_letter
+
+    # Activity and user rows are independent of the read-log stream, so
+    # they load on worker threads (each with its own app context, hence
+    # its own scoped session/connection) while the main thread streams
+    # the big join. Export latency becomes max() of the queries, not
+    # their sum. Results come back as plain dicts so nothing detached
+    # leaks out of the worker contexts.
+    def _load_activity_rows():
+        # Raw tuples straight off the cursor; shaping (timestamp
+        # formatting etc.) happens vectorized on the DataFrame instead
+        # of one strftime call per row.
+        with app.app_context():
+            return db.session.execute(
+                select(
+                    ActivityLog.id,
+                    ActivityLog.username,
+                    ActivityLog.action,
+                    ActivityLog.details,
+                    ActivityLog.ip_address,
+                    ActivityLog.user_agent,
+                    ActivityLog.timestamp,
+                ).order_by(ActivityLog.timestamp.desc())
+            ).all()
+
+    def _load_user_rows():
+        with app.app_context():
+            return [
+                {
+                    "ID": u.id,
+                    "Username": u.username,
+                    "Display Name": u.display_name,
+                    "Role": u.role,
+                }
+                for u in User.query.order_by(User.created_at)
+            ]
+
+    executor = ThreadPoolExecutor(max_workers=2)
+    activity_future = executor.submit(_load_activity_rows)
+    users_future = executor.submit(_load_user_rows)
+
+    # Read logs stream through a server-side cursor straight into a
+    # write-only worksheet: memory stays flat no matter how large the
+    # table is.
+    read_logs = (
+        db.session.query(ReadLog, Update, User)
+        .join(Update, ReadLog.update_id == Update.id)
+        .join(User, ReadLog.user_id == User.id)
+        .order_by(ReadLog.read_timestamp.desc())
+        .execution_options(stream_results=True)
+        .yield_per(5000)
+    )
+
+    wb = Workbook(write_only=True)
+
+    def _set_widths(ws, widths):
+        # write-only sheets require dimensions before rows are appended
+        for idx, width in enumerate(widths, start=1):
+            ws.column_dimensions[get_column_letter(idx)].width = width
+
+    ws_logs = wb.create_sheet("Read Logs")
+    _set_widths(ws_logs, (12, 24, 16, 24, 50, 21))
+    ws_logs.append(
+        [
+            "Read Log ID",
+            "Reader Name",
+            "Update Process",
+            "Update Author",
+            "Update Message",
+            "Read Timestamp",
+        ]
+    )
+
+    for log, update, user in read_logs:
+        message = update.message
+        if len(message) > 100:
+            message = message[:100] + "..."
+        ts = ensure_timezone(log.read_timestamp)
+        ws_logs.append(
+            [
+                log.id,
+                user.display_name,
+                update.process,
+                update.name,
+                message,
+                ts.strftime("%Y-%m-%d %H:%M:%S") if ts else "",
+            ]
+        )
+
+    # Summary aggregates run as GROUP BY queries against the composite
+    # read_logs index instead of Counter updates on every streamed row.
+    total_reads, unique_readers = db.session.execute(
+        select(func.count(ReadLog.id), func.count(func.distinct(ReadLog.user_id)))
+    ).one()
+
+    def _df_widths(df):
+        # Longest of header vs values, measured per column in one
+        # vectorized pass instead of a Python loop over every cell.
+        # A 500-row sample is within a character of the true maximum
+        # for these sheets and keeps width estimation O(1) as the
+        # activity log grows.
+        sample = df.head(500)
+        value_max = sample.astype(str).apply(lambda s: s.str.len().max()).fillna(0)
+        widths = (
+            np.maximum(df.columns.str.len().to_numpy(), value_max.to_numpy()) + 2
+        )
+        return np.clip(widths, 8, 50)
+
+    def _append_df(title, df):
+        # Hand-rolling the sheet XML (zipfile + inlineStr rows) would
+        # shave the remaining per-cell overhead, but it forks openpyxl's
+        # serializer for one sheet; write_only + lxml already streams
+        # rows through the C writer, so we stop there and just keep the
+        # per-row Python work minimal: itertuples hands back plain
+        # tuples (no Series per row, no index column) and the bound
+        # append skips an attribute lookup per row.
+        ws = wb.create_sheet(title)
+        _set_widths(ws, _df_widths(df))
+        ws.append(list(df.columns))
+        append = ws.append
+        for row in df.itertuples(index=False, name=None):
+            append(row)
+
+    try:
+        activity_df = pd.DataFrame.from_records(
+            activity_future.result(),
+            columns=[
+                "ID",
+                "Username",
+                "Action",
+                "Details",
+                "IP Address",
+                "User Agent",
+                "Timestamp",
+            ],
+        )
+        users_df = pd.DataFrame(users_future.result())
+    finally:
+        executor.shutdown(wait=False)
+    # One C-level pass per column beats N python strftime calls.
+    activity_df["Timestamp"] = (
+        pd.to_datetime(activity_df["Timestamp"])
+        .dt.strftime("%Y-%m-%d %H:%M:%S")
+        .fillna("")
+    )
+    # These columns repeat a handful of distinct values across the
+    # whole log; categorical dtype stores each string once plus small
+    # integer codes, keeping the frame compact on 100k-row exports.
+    for col in ("Username", "Action", "IP Address", "User Agent"):
+        activity_df[col] = activity_df[col].fillna("").astype("category")
+    _append_df("Activity Logs", activity_df)
+    _append_df("Users", users_df)
+
+    ws_summary = wb.create_sheet("Summary")
+    _set_widths(ws_summary, (20, 12))
+    ws_summary.append(["Metric", "Value"])
+    ws_summary.append(["Total Reads", total_reads])
+    ws_summary.append(["Unique Readers", unique_readers])
+    ws_summary.append(["Total Updates", Update.query.count()])
+
+    if total_reads:
+        ws_top = wb.create_sheet("Top Readers")
+        _set_widths(ws_top, (24, 10))
+        ws_top.append(["Reader Name", "Reads"])
+        top_readers = db.session.execute(
+            select(ReadLog.reader_name, func.count(ReadLog.id).label("reads"))
+            .group_by(ReadLog.reader_name)
+            .order_by(func.count(ReadLog.id).desc())
+            .limit(10)
+        )
+        for name, reads in top_readers:
+            ws_top.append([name, reads])
+
+        ws_most = wb.create_sheet("Most Read Updates")
+        _set_widths(ws_most, (50, 10))
+        ws_most.append(["Update Message", "Reads"])
+        most_read = db.session.execute(
+            select(Update.message, func.count(ReadLog.id).label("reads"))
+            .join(ReadLog, ReadLog.update_id == Update.id)
+            .group_by(Update.id, Update.message)
+            .order_by(func.count(ReadLog.id).desc())
+            .limit(10)
+        )
+        for message, reads in most_read:
+            if len(message) > 100:
+                message = message[:100] + "..."
+            ws_most.append([message, reads])
+
+        ws_proc = wb.create_sheet("Process Stats")
+        _set_widths(ws_proc, (16, 12, 14))
+        ws_proc.append(["Update Process", "Total Reads", "Unique Readers"])
+        process_stats = db.session.execute(
+            select(
+                Update.process,
+                func.count(ReadLog.id),
+                func.count(func.distinct(ReadLog.user_id)),
+            )
+            .join(ReadLog, ReadLog.update_id == Update.id)
+            .group_by(Update.process)
+            .order_by(Update.process)
+        )
+        for process, reads, readers in process_stats:
+            ws_proc.append([process, reads, readers])
+
+    # Spooled file: exports under the threshold stay in memory, bigger
+    # ones overflow to an anonymous temp file on disk — bounded RSS per
+    # concurrent download with no unlink bookkeeping, and send_file
+    # streams it through the WSGI file wrapper either way.
+    output = SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_BYTES)
+    wb.save(output)
+    output.seek(0)
+    return output
+
+
+# ---------------------------------------------------------------------------
+# JSON APIs polled by the frontend
+# ---------------------------------------------------------------------------
+
+# The UI polls both endpoints every few seconds per open tab; a 5s TTL
+# is invisible to users but collapses that fan-out to one query per TTL.
+API_CACHE_TTL = 5
+LATEST_TIME_CACHE_KEY = "api:latest_update_time"
+RECENT_UPDATES_CACHE_KEY = "api:recent_updates"
+
+
+def _invalidate_api_caches():
+    try:
+        cache.delete_many(LATEST_TIME_CACHE_KEY, RECENT_UPDATES_CACHE_KEY)
+    except Exception:
+        pass
+
+
+@app.route("/api/latest-update-time")
+def api_latest_update_time():
+    # Write-through cache: posts and edits publish the new timestamp
+    # directly (see _publish_latest_update_ts), so polling clients are
+    # served from Redis without ever racing the TTL. The DB fallback
+    # only runs on a cold cache, and max(timestamp) resolves with a
+    # single index-only probe of idx_update_timestamp_desc.
+    latest_iso = cache.get(LATEST_TIME_CACHE_KEY)
+    if latest_iso is None:
+        latest = db.session.query(func.max(Update.timestamp)).scalar()
+        latest_iso = ensure_timezone(latest).isoformat() if latest else ""
+        cache.set(LATEST_TIME_CACHE_KEY, latest_iso, timeout=API_CACHE_TTL)
+    return jsonify({"latest": latest_iso or None})
+
+
+def _publish_latest_update_ts(ts):
+    """Push a freshly written update timestamp into the poll cache."""
+    try:
+        cache.set(
+            LATEST_TIME_CACHE_KEY,
+            ensure_timezone(ts).isoformat(),
+            timeout=API_CACHE_TTL,
+        )
+    except Exception:
+        pass
+
+
+@app.route("/api/recent-updates")
+@cache.cached(timeout=API_CACHE_TTL, key_prefix=RECENT_UPDATES_CACHE_KEY)
+def recent_updates():
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=24)
+    # Column projection only — no ORM hydration for a polled endpoint.
+    # On Postgres the ISO timestamp is rendered by to_char inside the
+    # same scan, so the handler does zero per-row Python work.
+    cols = [Update.id, Update.name, Update.process, Update.message]
+    if db.engine.dialect.name == "postgresql":
+        cols.append(
+            func.to_char(
+                Update.timestamp, 'YYYY-MM-DD"T"HH24:MI:SS.US"+00:00"'
+            ).label("timestamp")
+        )
+    else:
+        cols.append(Update.timestamp)
+    rows = db.session.execute(
+        select(*cols)
+        .where(Update.timestamp >= cutoff)
+        .order_by(Update.timestamp.desc())
+        .limit(10)
+    ).mappings()
+
+    payload = [dict(row) for row in rows]
+    if db.engine.dialect.name != "postgresql":
+        for row in payload:
+            row["timestamp"] = ensure_timezone(row["timestamp"]).isoformat()
+    return jsonify({"updates": payload})
+
+
+# ---------------------------------------------------------------------------
+# backups
+# ---------------------------------------------------------------------------
+
+# list_backups stats every file in the backup directory; admins
+# refreshing the page re-pay that I/O for a listing that only changes
+# when a backup is created or removed, so those routes invalidate.
+BACKUP_LIST_CACHE_KEY = "backups:list"
+BACKUP_LIST_TTL = 30
+
+
+def _list_backups_cached():
+    backups = cache.get(BACKUP_LIST_CACHE_KEY)
+    if backups is None:
+        backups = app.backup_system.list_backups()
+        cache.set(BACKUP_LIST_CACHE_KEY, backups, timeout=BACKUP_LIST_TTL)
+    return backups
+
+
+@app.route("/backup")
+@login_required
+def backup_page():
+    return render_template(
+        "backup.html", backups=_list_backups_cached()
+    )
+
+
+@app.route("/backup/create", methods=["POST"])
+@login_required
+def create_backup():
+    backup_system = app.backup_system
+    info = backup_system.create_backup()
+    cache.delete(BACKUP_LIST_CACHE_KEY)
+    log_activity("create_backup", f"Created backup {info['filename']}")
+    flash(f"Backup created: {info['filename']}", "success")
+    return redirect(url_for("backup_page"))
+
+
+@app.route("/backup/restore", methods=["POST"])
+@login_required
+def restore_backup():
+    backup_system = app.backup_system
+    filename = request.form.get("filename", "")
+    backup_path = os.path.join(backup_system.backup_dir, os.path.basename(filename))
+    if not os.path.exists(backup_path):
+        flash("Backup file not found.", "danger")
+        return redirect(url_for("backup_page"))
+
+    # The old one-shot ThreadPoolExecutor couldn't actually cancel the
+    # restore on timeout — the worker kept writing after the 90s flash.
+    # A transaction-local statement_timeout lets Postgres terminate the
+    # work for real (and lifts the engine-wide 5s cap, which is too
+    # tight for a bulk restore).
+    if db.engine.dialect.name == "postgresql":
+        db.session.execute(text("SET LOCAL statement_timeout = '90s'"))
+    try:
+        result = backup_system.restore_backup(backup_path)
+    except OperationalError:
+        db.session.rollback()
+        flash("Restore timed out after 90 seconds.", "danger")
+        return redirect(url_for("backup_page"))
+
+    log_activity("restore_backup", f"Restored backup {filename}")
+    flash(f"Restored {result['restored_rows']} rows.", "success")
+    return redirect(url_for("backup_page"))
+
+
+@app.route("/backup/cleanup", methods=["POST"])
+@login_required
+def cleanup_backups():
+    backup_system = app.backup_system
+    result = backup_system.cleanup_old_backups()
+    cache.delete(BACKUP_LIST_CACHE_KEY)
+    flash(f"Removed {result['removed']} old backups.", "info")
+    return redirect(url_for("backup_page"))
+
+
+@app.route("/backup/delete", methods=["POST"])
+@login_required
+def delete_backup():
+    backup_system = app.backup_system
+    filename = request.form.get("filename", "")
+    if backup_system.delete_backup(filename):
+        cache.delete(BACKUP_LIST_CACHE_KEY)
+        flash(f"Deleted backup {filename}.", "info")
+    else:
+        flash("Backup file not found.", "danger")
+    return redirect(url_for("backup_page"))
+
+
+# ---------------------------------------------------------------------------
+# health & metrics
+# ---------------------------------------------------------------------------
+
+# At LB-probe rates the tz-aware isoformat() call adds up; one-second
+# granularity is plenty for probe timestamps.
+_CACHED_NOW_TS = 0.0
+_CACHED_NOW_STR = ""
+
+
+def _iso_now():
+    global _CACHED_NOW_TS, _CACHED_NOW_STR
+    now = time.time()
+    if now - _CACHED_NOW_TS >= 1.0:
+        _CACHED_NOW_TS = now
+        _CACHED_NOW_STR = now_utc().isoformat()
+    return _CACHED_NOW_STR
+
+
+# Probes arrive every few seconds per replica; memoizing the payload
+# for a second bounds the Redis pings to one per interval no matter how
+# many probes overlap.
+_HEALTH_TTL = 1.0
+_health_cached_at = 0.0
+_health_payload = None
+
+
+def _build_health_payload():
+    global _health_cached_at, _health_payload
+    now = time.monotonic()
+    if _health_payload is None or now - _health_cached_at >= _HEALTH_TTL:
+        _health_cached_at = now
+        _health_payload = {
+            "status": "ok",
+            "timestamp": _iso_now(),
+            "redis": is_redis_healthy(),
+            "uptime_seconds": int(time.time() - _START_TIME),
+        }
+    return _health_payload
+
+
+# The SELECT 1 is likewise memoized so probe traffic takes at most one
+# pooled connection per second instead of queueing behind user requests
+# on every hit.
+_DB_PROBE_TTL = 1.0
+_db_probe_at = 0.0
+_db_probe_err = None
+
+
+def _probe_db():
+    """Run SELECT 1 at most once per second; returns the last error or None."""
+    global _db_probe_at, _db_probe_err
+    now = time.monotonic()
+    if _db_probe_at == 0.0 or now - _db_probe_at >= _DB_PROBE_TTL:
+        _db_probe_at = now
+        try:
+            db.session.execute(text("SELECT 1"))
+            _db_probe_err = None
+        except Exception as exc:
+            _db_probe_err = exc
+    return _db_probe_err
+
+
+@app.route("/livez")
+def livez():
+    """Pure process-liveness probe: no database, no Redis, no pool."""
+    return jsonify({"status": "alive"})
+
+
+@app.route("/health")
+def health():
+    return jsonify(_build_health_payload())
+
+
+@app.route("/health/db")
+def health_db():
+    err = _probe_db()
+    if err is None:
+        return jsonify({"status": "ok", "timestamp": _iso_now()})
+    return jsonify({"status": "error", "error": str(err)}), 503
+
+
+# Listing tables spins up an Inspector and queries pg_catalog; the answer
+# never changes once the schema exists, so remember it and only re-check
+# while it's still False.
+_tables_present = False
+
+
+def _check_tables_present():
+    global _tables_present
+    if not _tables_present:
+        _tables_present = len(inspect(db.engine).get_table_names()) > 0
+    return _tables_present
+
+
+@app.route("/ready")
+def ready():
+    try:
+        if not _check_tables_present():
+            return jsonify({"status": "not ready", "reason": "no tables"}), 503
+        err = _probe_db()
+        if err is not None:
+            raise err
+        return jsonify({"status": "ready", "timestamp": _iso_now()})
+    except Exception as exc:
+        return jsonify({"status": "not ready", "reason": str(exc)}), 503
+
+
+@app.route("/health/detailed")
+def health_detailed():
+    db_ok = _probe_db() is None
+    payload = {
+        "status": "ok" if db_ok else "degraded",
+        "timestamp": _iso_now(),
+        "database": db_ok,
+        "redis": is_redis_healthy(),
+        "uptime_seconds": int(time.time() - _START_TIME),
+    }
+    return jsonify(payload), 200 if db_ok else 503
+
+
+# Keep-alive session for the alert webhook so repeated alerts reuse the
+# TCP connection instead of paying a cold connect per call. Built lazily
+# so `requests` is only imported if an alert is ever sent.
+_alert_session = None
+
+
+def _get_alert_session():
+    global _alert_session
+    if _alert_session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        _alert_session = requests.Session()
+        # One webhook target: a single kept-alive connection is all the
+        # pool ever needs.
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+        _alert_session.mount("https://", adapter)
+        _alert_session.mount("http://", adapter)
+    return _alert_session
+
+
+@app.route("/health/alert", methods=["POST"])
+def health_alert():
+    webhook_url = os.getenv("ALERT_WEBHOOK_URL")
+    if not webhook_url:
+        return jsonify({"status": "skipped", "reason": "no webhook configured"})
+
+    payload = _build_health_payload()
+    _get_alert_session().post(webhook_url, json=payload, timeout=5)
+    return jsonify({"status": "sent", "health": payload})
+
+
+def _estimate_update_count():
+    """Planner estimate of the updates row count (Postgres).
+
+    /metrics is scraped every few seconds and only needs an approximate
+    figure, so the O(1) pg_class lookup beats a full-table count(*).
+    SQLite keeps the exact count — tables there are tiny.
+    """
+    if db.engine.dialect.name == "postgresql":
+        estimate = db.session.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE relname = 'updates'")
+        ).scalar()
+        if estimate is not None and estimate >= 0:
+            return estimate
+    return db.session.query(func.count()).select_from(Update).scalar()
+
+
+# Scrape-rate memo: the gauge inputs only need to be fresh to within a
+# scrape interval, so each key refreshes at most once per TTL however
+# many Prometheus instances poll us. The lock stops concurrent scrapes
+# from racing to refresh the same expired key.
+_METRICS_CACHE = {}
+_METRICS_CACHE_LOCK = threading.Lock()
+
+
+def _cached_count(key, ttl, fn):
+    now = time.monotonic()
+    with _METRICS_CACHE_LOCK:
+        value, fetched_at = _METRICS_CACHE.get(key, (None, 0.0))
+        if value is not None and now - fetched_at < ttl:
+            return value
+        # Refresh under the lock: fn() is a planner-estimate lookup or
+        # a ping, cheap enough not to serialize scrapes noticeably.
+        value = fn()
+        _METRICS_CACHE[key] = (value, now)
+        return value
+
+
+# Module-level singleton so gauges live in prometheus_client's default
+# registry exactly once per process, no matter how many times create_app
+# runs (tests build several apps). Still imported lazily on first scrape.
+_PROM = None
+
+
+def _get_prometheus():
+    global _PROM
+    if _PROM is None:
+        import prometheus_client
+        from prometheus_client import Gauge
+
+        registry = None
+        if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+            # Under multi-worker gunicorn each worker writes its samples
+            # to mmap files; scrapes aggregate them via this collector.
+            from prometheus_client import CollectorRegistry, multiprocess
+
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        _PROM = {
+            "module": prometheus_client,
+            "registry": registry,
+            "gauges": {
+                "uptime": Gauge("loopin_uptime_seconds", "App uptime"),
+                "updates": Gauge("loopin_updates_total", "Total updates"),
+                "redis": Gauge("loopin_redis_up", "Redis healthy"),
+            },
+        }
+    return _PROM
+
+
+@app.route("/metrics")
+def metrics():
+    if not PROMETHEUS_AVAILABLE:
+        return "prometheus_client not installed", 501
+
+    from flask import Response
+
+    prom = _get_prometheus()
+    gauges = prom["gauges"]
+    gauges["uptime"].set(time.time() - _START_TIME)
+    gauges["updates"].set(_cached_count("updates_total", 15, _estimate_update_count))
+    gauges["redis"].set(
+        _cached_count("redis_up", 15, lambda: 1 if is_redis_healthy() else 0)
+    )
+    client = prom["module"]
+    payload = (
+        client.generate_latest(prom["registry"])
+        if prom["registry"] is not None
+        else client.generate_latest()
+    )
+    # direct_passthrough hands the bytes straight to the WSGI server
+    # instead of Flask re-buffering the payload.
+    return Response(
+        payload, mimetype=client.CONTENT_TYPE_LATEST, direct_passthrough=True
+    )
+
+
+if __name__ == "__main__":
+    app.run(host="0.0.0.0", port=int(os.getenv("PORT", "5000")), debug=True)
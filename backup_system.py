@@ -0,0 +1,124 @@
+"""JSON-file based backup/restore for the LoopIn database.
+
+Backups are gzipped JSON dumps of every table, written into BACKUP_DIR
+(defaults to ./backups). Good enough for a small team app on Railway.
+"""
+
+import gzip
+import json
+import os
+from datetime import datetime, timezone
+
+from models import (
+    ActivityLog,
+    ArchivedLessonLearned,
+    ArchivedSOPSummary,
+    ArchivedUpdate,
+    LessonLearned,
+    ReadLog,
+    SOPSummary,
+    Update,
+    User,
+    db,
+)
+
+BACKUP_TABLES = [
+    User,
+    Update,
+    ReadLog,
+    ActivityLog,
+    SOPSummary,
+    LessonLearned,
+    ArchivedUpdate,
+    ArchivedSOPSummary,
+    ArchivedLessonLearned,
+]
+
+
+def _serialize_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class DatabaseBackupSystem:
+    def __init__(self):
+        self.backup_dir = os.getenv("BACKUP_DIR", "backups")
+        os.makedirs(self.backup_dir, exist_ok=True)
+
+    def create_backup(self):
+        timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+        filename = f"loopin_backup_{timestamp}.json.gz"
+        path = os.path.join(self.backup_dir, filename)
+
+        payload = {"created_at": datetime.now(timezone.utc).isoformat(), "tables": {}}
+        for model in BACKUP_TABLES:
+            rows = []
+            for obj in model.query.all():
+                rows.append(
+                    {
+                        col.name: _serialize_value(getattr(obj, col.name))
+                        for col in model.__table__.columns
+                    }
+                )
+            payload["tables"][model.__tablename__] = rows
+
+        with gzip.open(path, "wt", encoding="utf-8") as fh:
+            json.dump(payload, fh)
+        return {"filename": filename, "path": path, "size": os.path.getsize(path)}
+
+    def list_backups(self):
+        backups = []
+        for name in os.listdir(self.backup_dir):
+            if not name.endswith(".json.gz"):
+                continue
+            path = os.path.join(self.backup_dir, name)
+            stat = os.stat(path)
+            backups.append(
+                {
+                    "filename": name,
+                    "path": path,
+                    "size": stat.st_size,
+                    "created_at": datetime.fromtimestamp(
+                        stat.st_mtime, timezone.utc
+                    ).isoformat(),
+                }
+            )
+        backups.sort(key=lambda b: b["created_at"], reverse=True)
+        return backups
+
+    def restore_backup(self, backup_path):
+        with gzip.open(backup_path, "rt", encoding="utf-8") as fh:
+            payload = json.load(fh)
+
+        table_by_name = {m.__tablename__: m for m in BACKUP_TABLES}
+        restored = 0
+        for table_name, rows in payload.get("tables", {}).items():
+            model = table_by_name.get(table_name)
+            if model is None:
+                continue
+            model.query.delete()
+            for row in rows:
+                values = dict(row)
+                for col in model.__table__.columns:
+                    if isinstance(col.type, db.DateTime) and values.get(col.name):
+                        values[col.name] = datetime.fromisoformat(values[col.name])
+                db.session.add(model(**values))
+                restored += 1
+        db.session.commit()
+        return {"restored_rows": restored}
+
+    def cleanup_old_backups(self, keep=10):
+        backups = self.list_backups()
+        removed = 0
+        for backup in backups[keep:]:
+            os.remove(backup["path"])
+            removed += 1
+        return {"removed": removed}
+
+    def delete_backup(self, filename):
+        path = os.path.join(self.backup_dir, os.path.basename(filename))
+        if os.path.exists(path):
+            os.remove(path)
+            return True
+        return False
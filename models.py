@@ -0,0 +1,194 @@
+"""Database models for the LoopIn updates board."""
+
+import uuid
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.dialects.postgresql import UUID
+from werkzeug.security import check_password_hash, generate_password_hash
+
+db = SQLAlchemy()
+
+# Native uuid on Postgres: 16-byte index entries instead of 32-char text,
+# roughly halving the PK B-tree and every ReadLog join. as_uuid=False so
+# ids stay plain strings in Python — routes, templates and JSON payloads
+# are unaffected. SQLite keeps a string column.
+UUIDString = UUID(as_uuid=False).with_variant(db.String(36), "sqlite")
+
+IST = ZoneInfo("Asia/Kolkata")
+
+
+def now_utc():
+    """Current time as an aware UTC datetime."""
+    return datetime.now(timezone.utc)
+
+
+class User(db.Model):
+    __tablename__ = "users"
+
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80), unique=True, nullable=False)
+    password_hash = db.Column(db.String(255), nullable=False)
+    display_name = db.Column(db.String(120), nullable=False)
+    role = db.Column(db.String(20), default="member", nullable=False)
+    created_at = db.Column(db.DateTime, default=now_utc)
+
+    # Login/register normalize to lowercase before querying; the
+    # expression index makes that lookup a unique index seek even if a
+    # mixed-case value ever lands in the column.
+    __table_args__ = (
+        db.Index("ix_users_username_lower", db.func.lower(username), unique=True),
+    )
+
+    def set_password(self, password):
+        self.password_hash = generate_password_hash(password)
+
+    def check_password(self, password):
+        return check_password_hash(self.password_hash, password)
+
+
+class Update(db.Model):
+    __tablename__ = "updates"
+    # show_updates sorts every render by timestamp DESC (optionally
+    # filtered by process); without these Postgres seq-scans and sorts.
+    __table_args__ = (
+        db.Index("idx_update_timestamp_desc", db.desc("timestamp")),
+        db.Index("idx_update_process_timestamp", "process", db.desc("timestamp")),
+    )
+
+    id = db.Column(UUIDString, primary_key=True, default=lambda: str(uuid.uuid4()))
+    name = db.Column(db.String(120), nullable=False)
+    process = db.Column(db.String(50), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    # timezone=True -> TIMESTAMPTZ on Postgres, so cutoff comparisons
+    # against aware datetimes hit the index without casts.
+    timestamp = db.Column(db.DateTime(timezone=True), default=now_utc)
+    # Denormalized count of read_logs rows; maintained by a Postgres
+    # trigger (app-side on SQLite) so list views never join read_logs.
+    read_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    read_logs = db.relationship(
+        "ReadLog", backref="update", lazy=True, cascade="all, delete-orphan"
+    )
+
+    def to_dict(self):
+        ts = self.timestamp
+        if ts is not None and ts.tzinfo is None:
+            ts = ts.replace(tzinfo=timezone.utc)
+        ist_time = ts.astimezone(IST) if ts is not None else None
+        return {
+            "id": self.id,
+            "name": self.name,
+            "process": self.process,
+            "message": self.message,
+            "timestamp": ist_time.strftime("%d/%m/%Y, %H:%M:%S") if ist_time else None,
+        }
+
+
+class ReadLog(db.Model):
+    __tablename__ = "read_logs"
+    # Composite covers both the per-update aggregate (leading column)
+    # and the "has this user read it" probe in view_update.
+    __table_args__ = (db.Index("idx_readlog_update_user", "update_id", "user_id"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    update_id = db.Column(UUIDString, db.ForeignKey("updates.id"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    reader_name = db.Column(db.String(120))
+    read_timestamp = db.Column(db.DateTime, default=now_utc)
+
+
+class ActivityLog(db.Model):
+    __tablename__ = "activity_logs"
+    # The export and admin views always read newest-first.
+    __table_args__ = (
+        db.Index("idx_activitylog_timestamp_desc", db.desc("timestamp")),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer)
+    username = db.Column(db.String(120))
+    action = db.Column(db.String(120), nullable=False)
+    details = db.Column(db.Text)
+    ip_address = db.Column(db.String(64))
+    user_agent = db.Column(db.String(255))
+    timestamp = db.Column(db.DateTime, default=now_utc)
+
+
+class SOPSummary(db.Model):
+    __tablename__ = "sop_summaries"
+    __table_args__ = (db.Index("idx_sop_created_at_desc", db.desc("created_at")),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(200), nullable=False)
+    department = db.Column(db.String(100))
+    summary_text = db.Column(db.Text, nullable=False)
+    tags = db.Column(db.String(255))
+    created_by = db.Column(db.String(120))
+    created_at = db.Column(db.DateTime, default=now_utc)
+
+
+class LessonLearned(db.Model):
+    __tablename__ = "lessons_learned"
+    __table_args__ = (
+        db.Index("idx_lesson_created_at_dept", db.desc("created_at"), "department"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(200), nullable=False)
+    department = db.Column(db.String(100))
+    summary = db.Column(db.String(255))
+    content = db.Column(db.Text, nullable=False)
+    created_by = db.Column(db.String(120))
+    created_at = db.Column(db.DateTime, default=now_utc)
+
+
+class ArchivedUpdate(db.Model):
+    __tablename__ = "archived_updates"
+    # archives_page lists each archive newest-first.
+    __table_args__ = (
+        db.Index("idx_archived_update_archived_at_desc", db.desc("archived_at")),
+    )
+
+    id = db.Column(UUIDString, primary_key=True)
+    name = db.Column(db.String(120), nullable=False)
+    process = db.Column(db.String(50), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    timestamp = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=now_utc)
+    archived_by = db.Column(db.String(120))
+
+
+class ArchivedSOPSummary(db.Model):
+    __tablename__ = "archived_sop_summaries"
+    __table_args__ = (
+        db.Index("idx_archived_sop_archived_at_desc", db.desc("archived_at")),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(200), nullable=False)
+    department = db.Column(db.String(100))
+    summary_text = db.Column(db.Text, nullable=False)
+    tags = db.Column(db.String(255))
+    created_by = db.Column(db.String(120))
+    created_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=now_utc)
+    archived_by = db.Column(db.String(120))
+
+
+class ArchivedLessonLearned(db.Model):
+    __tablename__ = "archived_lessons_learned"
+    __table_args__ = (
+        db.Index("idx_archived_lesson_archived_at_desc", db.desc("archived_at")),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(200), nullable=False)
+    department = db.Column(db.String(100))
+    summary = db.Column(db.String(255))
+    content = db.Column(db.Text, nullable=False)
+    created_by = db.Column(db.String(120))
+    created_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=now_utc)
+    archived_by = db.Column(db.String(120))
@@ -0,0 +1,50 @@
+"""Read-tracking blueprint: records who has seen which update."""
+
+import uuid
+
+from flask import Blueprint, jsonify, session
+
+from models import ReadLog, Update, User, db, now_utc
+
+read_logs_bp = Blueprint("read_logs", __name__)
+
+
+@read_logs_bp.route("/updates/<update_id>/read", methods=["POST"])
+def mark_read(update_id):
+    if "user_id" not in session:
+        return jsonify({"error": "login required"}), 401
+
+    # update_id compares against a native uuid column on Postgres;
+    # malformed ids would raise DataError instead of matching nothing.
+    try:
+        uuid.UUID(update_id)
+    except ValueError:
+        return jsonify({"error": "unknown update"}), 404
+
+    user = db.session.get(User, session["user_id"])
+    if user is None:
+        return jsonify({"error": "unknown user"}), 401
+
+    existing = ReadLog.query.filter_by(update_id=update_id, user_id=user.id).first()
+    if existing is None:
+        log = ReadLog(
+            update_id=update_id,
+            user_id=user.id,
+            reader_name=user.display_name,
+            read_timestamp=now_utc(),
+        )
+        db.session.add(log)
+        if db.engine.dialect.name != "postgresql":
+            # Postgres keeps updates.read_count current via trigger;
+            # SQLite dev setups bump it here instead.
+            Update.query.filter_by(id=update_id).update(
+                {Update.read_count: Update.read_count + 1}
+            )
+        db.session.commit()
+        # The feed renders read_count; roll its version so ETag-holding
+        # clients don't 304 onto the old number indefinitely.
+        from app import _bump_feed_version
+
+        _bump_feed_version()
+
+    return jsonify({"status": "ok"})
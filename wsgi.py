@@ -0,0 +1,21 @@
+"""Gunicorn entrypoint for gevent workers.
+
+Monkey-patching has to happen before anything imports the blocking
+stdlib primitives (socket, ssl, threading), so this module must stay
+the process entrypoint — don't import app first.
+"""
+
+from gevent import monkey
+
+monkey.patch_all()
+
+try:
+    from psycogreen.gevent import patch_psycopg
+
+    patch_psycopg()
+except ImportError:
+    # SQLite dev setups don't install psycopg2; sockets are patched
+    # either way.
+    pass
+
+from app import app  # noqa: E402  (must follow the monkey-patching)